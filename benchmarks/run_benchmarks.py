@@ -0,0 +1,159 @@
+"""Benchmark the journal's data paths on synthetic journals.
+
+Times what each page computes — dashboard metrics, rollups, portfolio aggregation,
+INR formatting, CSV export and import — at several journal sizes and
+reports the best wall time and the peak traced memory of each. Results
+are compared with a stored baseline and the run fails (exit code 1) when
+a case regresses beyond the tolerance:
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --sizes 1000 100000 --only csv_import
+    python benchmarks/run_benchmarks.py --update-baseline
+
+Baselines are machine-specific; refresh them when moving to new hardware.
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from journal_core import (  # noqa: E402
+    TransactionStore,
+    compute_dashboard_metrics,
+    compute_lots,
+    compute_xirr,
+    downsample_frame,
+    export_journal,
+    format_inr_array,
+    import_csv,
+    monthly_activity,
+)
+from synthetic import generate_journal  # noqa: E402
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# Differences below these floors are noise, whatever the ratio
+MIN_SECONDS = 0.005
+MIN_PEAK_MB = 1.0
+
+
+def benchmark_cases(df):
+    """Map case name → zero-argument callable over a journal frame"""
+    store = TransactionStore(df)
+    frame = store.frame()
+    csv_bytes = export_journal(frame, 'csv')
+    return {
+        'store_load': lambda: TransactionStore(df),
+        'dashboard_metrics': lambda: compute_dashboard_metrics(frame),
+        'fifo_lots': lambda: compute_lots(frame, 'fifo'),
+        'average_lots': lambda: compute_lots(frame, 'average'),
+        'rollups': lambda: TransactionStore(df).rollups,
+        'monthly_activity': lambda: monthly_activity(store.rollup('Month')),
+        'xirr': lambda: compute_xirr(frame),
+        'downsample': lambda: downsample_frame(frame, 'Date', ['Total_Value']),
+        'format_inr': lambda: format_inr_array(frame['Total_Value']),
+        'csv_export': lambda: export_journal(frame, 'csv'),
+        'csv_import': lambda: import_csv(BytesIO(csv_bytes), TransactionStore()),
+    }
+
+
+def measure(func, repeat):
+    """Best wall time over ``repeat`` runs and peak traced memory (MiB) of one more"""
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'seconds': round(best, 6), 'peak_mb': round(peak / 2**20, 3)}
+
+
+def run(sizes, repeat, only=None):
+    results = {}
+    for rows in sizes:
+        df = generate_journal(rows)
+        cases = benchmark_cases(df)
+        results[str(rows)] = {}
+        for name, func in cases.items():
+            if only and name not in only:
+                continue
+            results[str(rows)][name] = result = measure(func, repeat)
+            print(f"{rows:>10,}  {name:<18} {result['seconds'] * 1000:>10.1f} ms  {result['peak_mb']:>9.1f} MiB")
+        del df, cases
+    return results
+
+
+def find_regressions(results, baseline, tolerance, memory_tolerance):
+    regressions = []
+    for rows, cases in results.items():
+        for name, result in cases.items():
+            expected = baseline.get(rows, {}).get(name)
+            if expected is None:
+                continue
+            for metric, ratio, floor in (
+                ('seconds', tolerance, MIN_SECONDS),
+                ('peak_mb', memory_tolerance, MIN_PEAK_MB),
+            ):
+                limit = max(expected[metric] * (1 + ratio), expected[metric] + floor)
+                if result[metric] > limit:
+                    regressions.append(f"{name} @ {int(rows):,} rows: {metric} {result[metric]} > {limit:.3f} (baseline {expected[metric]})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark journal data paths on synthetic data.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="Journal sizes in rows")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per case (best is kept)")
+    parser.add_argument('--only', nargs='+', help="Run only these cases")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument('--update-baseline', action='store_true', help="Write results to the baseline instead of comparing")
+    parser.add_argument('--tolerance', type=float, default=0.5, help="Allowed slowdown ratio (0.5 = 50%% slower)")
+    parser.add_argument('--memory-tolerance', type=float, default=0.25, help="Allowed peak memory growth ratio")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.repeat, args.only)
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        for rows, cases in results.items():
+            baseline.setdefault(rows, {}).update(cases)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = find_regressions(results, baseline, args.tolerance, args.memory_tolerance)
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+    if not regressions:
+        print("No regressions against baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Synthetic journal generator for benchmarks.
+
+Produces journals shaped like the real one (Indian stocks and funds,
+buys/sells/dividends, free-text rationale and notes) at any size, from a
+seed so runs are reproducible.
+"""
+
+import numpy as np
+import pandas as pd
+
+WORDS = np.array([
+    'strong', 'fundamentals', 'growth', 'valuation', 'dividend', 'sector', 'outlook',
+    'earnings', 'margin', 'expansion', 'digital', 'banking', 'quarter', 'guidance',
+    'momentum', 'correction', 'rebalance', 'profit', 'booking', 'long', 'term',
+    'allocation', 'risk', 'fund', 'manager', 'consistent', 'returns', 'market', 'share',
+    'demand', 'exports', 'capex', 'debt', 'reduction', 'management', 'commentary',
+])
+
+ASSET_TYPES = ['Stock', 'Mutual Fund', 'ETF']
+
+
+def make_symbols(count):
+    return [f"SYM{i:04d}.NS" for i in range(count)]
+
+
+def random_text(rng, rows, length):
+    """``rows`` strings of roughly ``length`` characters drawn from WORDS"""
+    if length <= 0:
+        return np.full(rows, '', dtype=object)
+    words = max(1, length // 8)
+    picks = WORDS[rng.integers(0, len(WORDS), size=(rows, words))]
+    return np.array([' '.join(row) for row in picks], dtype=object)
+
+
+def generate_journal(rows, symbols=50, action_mix=(0.7, 0.2, 0.1), text_length=80,
+                     notes_fraction=0.3, start='2015-01-01', days=3650, seed=0):
+    """Random journal of ``rows`` transactions over ``symbols`` instruments.
+
+    ``action_mix`` gives the Buy/Sell/Dividend proportions. Rationale and
+    (for ``notes_fraction`` of rows) outcome notes are about
+    ``text_length`` characters. Rows are in date order.
+    """
+    rng = np.random.default_rng(seed)
+    names = make_symbols(symbols)
+    symbol_codes = rng.integers(0, symbols, size=rows)
+    base_price = rng.uniform(50, 5000, size=symbols)
+
+    mix = np.asarray(action_mix, dtype=np.float64)
+    actions = rng.choice(np.array(['Buy', 'Sell', 'Dividend']), size=rows, p=mix / mix.sum())
+    dates = np.sort(rng.integers(0, days, size=rows))
+
+    quantity = rng.integers(1, 100, size=rows).astype(np.float64)
+    price = np.round(base_price[symbol_codes] * rng.uniform(0.7, 1.3, size=rows), 2)
+    # Dividends are stored as one unit at the amount paid, as the app records them
+    dividend = actions == 'Dividend'
+    amount = np.round(rng.uniform(100, 5000, size=rows), 2)
+    quantity[dividend] = 1.0
+    price[dividend] = amount[dividend]
+    total_value = quantity * price
+    current_price = np.round(base_price[symbol_codes] * rng.uniform(0.8, 1.5, size=rows), 2)
+    unrealized = np.where(actions == 'Buy', quantity * (current_price - price), 0.0)
+
+    notes = random_text(rng, rows, text_length)
+    notes[rng.random(rows) >= notes_fraction] = ''
+
+    return pd.DataFrame({
+        'Date': pd.Timestamp(start) + pd.to_timedelta(dates, unit='D'),
+        'Type': np.array(ASSET_TYPES, dtype=object)[symbol_codes % len(ASSET_TYPES)],
+        'Symbol': np.array(names, dtype=object)[symbol_codes],
+        'Name': np.array([f"Company {name[3:7]}" for name in names], dtype=object)[symbol_codes],
+        'Action': actions.astype(object),
+        'Quantity': quantity,
+        'Price': price,
+        'Total_Value': total_value,
+        'Rationale': random_text(rng, rows, text_length),
+        'Outcome_Notes': notes,
+        'Current_Price': current_price,
+        'Unrealized_PnL': unrealized,
+    })
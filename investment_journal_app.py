@@ -1,22 +1,57 @@
-
 import streamlit as st
 import pandas as pd
+import numpy as np
 import json
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
 from datetime import datetime, date
 import locale
 from io import StringIO
-
-# Configure page
-st.set_page_config(
-    page_title="Personal Investment Journal",
-    page_icon="📊",
-    layout="wide",
-    initial_sidebar_state="expanded"
+import os
+from contextlib import contextmanager
+
+from journal_core import (
+    DEFAULT_POINT_BUDGET,
+    WEBGL_THRESHOLD,
+    COLUMNAR_AVAILABLE,
+    COLUMNAR_EXTENSIONS,
+    DEFAULT_MAX_OPEN_STORES,
+    COST_BASIS_METHODS,
+    STATEMENT_EXTENSIONS,
+    EXPORT_FORMATS,
+    StageTimer,
+    VALID_ACTIONS,
+    CachedQuoteProvider,
+    DerivedViewCache,
+    PriceHistoryQuoteProvider,
+    QuoteCache,
+    TransactionFilter,
+    compute_lots,
+    compute_performers,
+    compute_portfolio_timeseries,
+    compute_returns,
+    downsample_frame,
+    export_journal,
+    format_inr,
+    format_inr_array,
+    import_columnar,
+    import_csv,
+    import_statements,
+    load_price_history,
+    monthly_activity,
+    open_journal_pool,
+    open_quote_provider,
+    open_store,
+    price_files,
+    revalue_journal,
+    sample_columns,
+    type_allocation,
+    validate_transactions,
 )
 
-# Custom CSS for themes
+# Custom CSS for themes, built once per process
+@st.cache_resource(show_spinner=False)
 def load_css():
     return """
     <style>
@@ -53,94 +88,55 @@ def load_css():
     </style>
     """
 
+# Serve a derived view from the session cache
+def cached_view(name, compute, *args):
+    journal = st.session_state.journal
+    return st.session_state.view_cache.get(
+        (name,) + args,
+        journal.version,
+        lambda: compute(journal, *args)
+    )
+
+
 # Initialize session state
 def init_session_state():
     if 'theme' not in st.session_state:
         st.session_state.theme = 'light'
 
-    if 'investment_data' not in st.session_state:
-        # Sample data with INR currency
-        st.session_state.investment_data = [
-            {
-                'Date': '2024-01-15',
-                'Type': 'Stock',
-                'Symbol': 'TCS.NS',
-                'Name': 'Tata Consultancy Services',
-                'Action': 'Buy',
-                'Quantity': 10,
-                'Price': 3500.00,
-                'Total_Value': 35000.00,
-                'Rationale': 'Strong Q3 results and digital transformation demand',
-                'Outcome_Notes': 'Stock up 8% after good quarterly results',
-                'Current_Price': 3780.00,
-                'Unrealized_PnL': 2800.00
-            },
-            {
-                'Date': '2024-02-10',
-                'Type': 'Mutual Fund',
-                'Symbol': 'SBI-BLUECHIP',
-                'Name': 'SBI Bluechip Fund',
-                'Action': 'Buy',
-                'Quantity': 100,
-                'Price': 850.00,
-                'Total_Value': 85000.00,
-                'Rationale': 'Diversified large cap exposure for long term wealth creation',
-                'Outcome_Notes': 'Steady performance as expected',
-                'Current_Price': 895.50,
-                'Unrealized_PnL': 4550.00
-            },
-            {
-                'Date': '2024-03-05',
-                'Type': 'Stock',
-                'Symbol': 'INFY.NS',
-                'Name': 'Infosys Limited',
-                'Action': 'Sell',
-                'Quantity': 20,
-                'Price': 1450.00,
-                'Total_Value': 29000.00,
-                'Rationale': 'Booking profits after 25% gain, concerned about margin pressure',
-                'Outcome_Notes': 'Good exit timing, stock consolidated afterwards',
-                'Current_Price': 1420.00,
-                'Unrealized_PnL': 0.00
-            }
-        ]
-
-# Format currency in INR
-def format_inr(amount):
-    """Format amount in Indian Rupee format"""
-    if amount == 0:
-        return "₹0.00"
-
-    # Handle negative amounts
-    is_negative = amount < 0
-    amount = abs(amount)
-
-    # Format with Indian numbering system
-    amount_str = f"{amount:,.2f}"
+    if 'journal' not in st.session_state and get_journal_pool() is None:
+        st.session_state.journal = open_store()
 
-    # Convert to Indian numbering (lakhs and crores)
-    parts = amount_str.split('.')
-    integer_part = parts[0].replace(',', '')
-    decimal_part = parts[1]
+    if 'view_cache' not in st.session_state:
+        st.session_state.view_cache = DerivedViewCache()
 
-    # Format according to Indian system
-    if len(integer_part) > 3:
-        last_three = integer_part[-3:]
-        remaining = integer_part[:-3]
+    if 'profiler' not in st.session_state:
+        st.session_state.profiler = StageTimer()
+        st.session_state.profiling = os.environ.get('JOURNAL_PROFILE', '').lower() in ('1', 'true', 'yes')
 
-        formatted = last_three
-        while len(remaining) > 2:
-            formatted = remaining[-2:] + ',' + formatted
-            remaining = remaining[:-2]
 
-        if remaining:
-            formatted = remaining + ',' + formatted
+# Mark the end of a timed step (no-op unless instrumentation is on)
+def checkpoint(step, frame=None):
+    st.session_state.profiler.checkpoint(step, frame)
 
-        result = f"₹{formatted}.{decimal_part}"
-    else:
-        result = f"₹{amount_str}"
 
-    return f"-{result}" if is_negative else result
+# Per-rerun timing breakdown and rolling percentiles
+def instrumentation_panel(profiler):
+    ms = st.column_config.NumberColumn(format="%.1f")
+    with st.sidebar.expander("⏱️ Timings", expanded=True):
+        st.caption(f"Rerun {profiler.reruns} · {len(profiler.history)} stages tracked")
+        st.dataframe(
+            profiler.breakdown(),
+            column_config={'ms': ms},
+            hide_index=True,
+            use_container_width=True
+        )
+        st.markdown("**Rolling percentiles**")
+        st.dataframe(
+            profiler.percentiles(),
+            column_config={col: ms for col in ['p50 ms', 'p90 ms', 'p99 ms']},
+            hide_index=True,
+            use_container_width=True
+        )
 
 # Theme toggle
 def theme_toggle():
@@ -162,20 +158,153 @@ def theme_toggle():
         st.session_state.theme = selected_theme
         st.rerun()
 
+# Price history and quote cache shared by all sessions
+@st.cache_resource(show_spinner=False)
+def _shared_price_history(directory, signature):
+    return load_price_history(directory)
+
+
+def get_price_history():
+    """Process-wide price history, reloaded when files in the directory change"""
+    directory = os.environ.get('JOURNAL_PRICES_DIR', 'prices')
+    signature = tuple((path, os.path.getmtime(path)) for path in price_files(directory))
+    return _shared_price_history(directory, signature), signature
+
+
+def cached_portfolio_timeseries():
+    """Daily valuation of the journal (None without price history) and the price signature"""
+    prices, price_signature = get_price_history()
+    if prices is None:
+        return None, price_signature
+    timeseries = cached_view(
+        'portfolio_timeseries',
+        lambda journal, signature: compute_portfolio_timeseries(journal.frame(), prices),
+        price_signature
+    )
+    return timeseries, price_signature
+
+@st.cache_resource(show_spinner=False)
+def _shared_quote_cache(provider, ttl):
+    return QuoteCache(ttl)
+
+
+def get_quote_provider():
+    """The configured quote provider behind a TTL cache shared by all sessions"""
+    provider = os.environ.get('JOURNAL_QUOTE_PROVIDER', 'prices')
+    ttl = float(os.environ.get('JOURNAL_QUOTE_TTL', 300))
+    if provider == 'prices':
+        # Quote from the shared price history rather than reloading the directory
+        source = PriceHistoryQuoteProvider(get_price_history()[0])
+    else:
+        source = open_quote_provider(provider)
+    return CachedQuoteProvider(source, _shared_quote_cache(provider, ttl))
+
+
+# Per-user journals, shared by all sessions of the process
+@st.cache_resource(show_spinner=False)
+def _shared_journal_pool(directory, max_bytes, max_stores):
+    return open_journal_pool(directory, max_bytes, max_stores)
+
+
+def get_journal_pool():
+    """The per-user journal pool, or None when ``JOURNAL_USERS_DIR`` is unset"""
+    directory = os.environ.get('JOURNAL_USERS_DIR')
+    if not directory:
+        return None
+    budget = float(os.environ.get('JOURNAL_MEMORY_BUDGET_MB', 512))
+    max_stores = int(os.environ.get('JOURNAL_MAX_OPEN_STORES', DEFAULT_MAX_OPEN_STORES))
+    return _shared_journal_pool(directory, int(budget * 1024 * 1024), max_stores)
+
+
+def current_user_id():
+    """Signed-in user's email, else the ``user`` query parameter, else 'default'"""
+    if getattr(st.user, 'is_logged_in', False):
+        return st.user.email
+    return st.query_params.get('user', 'default')
+
+
+@contextmanager
+def user_journal():
+    """Check the user's journal out of the pool for the rest of this rerun"""
+    pool = get_journal_pool()
+    if pool is None:
+        yield st.session_state.journal
+        return
+    user_id = current_user_id()
+    if st.session_state.get('user_id') != user_id:
+        st.session_state.user_id = user_id
+        st.session_state.view_cache.clear()
+    st.session_state.journal = pool.checkout(user_id)
+    try:
+        yield st.session_state.journal
+    finally:
+        pool.checkin(user_id)
+
+# Plotly templates per theme, shared read-only by all sessions
+@st.cache_resource(show_spinner=False)
+def figure_templates():
+    light = go.layout.Template(pio.templates['plotly'])
+    dark = go.layout.Template(pio.templates['plotly'])
+    dark.layout.update(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font_color='white'
+    )
+    return {'light': light, 'dark': dark}
+
+
+def allocation_figure(allocation, theme):
+    return px.pie(
+        allocation,
+        values='Total_Value',
+        names='Type',
+        title="Investment Allocation by Type",
+        template=figure_templates()[theme]
+    )
+
+
+def monthly_figure(activity, theme):
+    return px.bar(
+        activity,
+        x='Month',
+        y=['Buy', 'Sell', 'Dividend'],
+        barmode='group',
+        labels={'value': 'Amount (₹)', 'variable': ''},
+        title="Monthly Investments, Sales and Dividends",
+        template=figure_templates()[theme]
+    )
+
+
+# Time series are reduced to this many points before plotting, and line
+# traces switch to WebGL when more than JOURNAL_WEBGL_POINTS remain
+CHART_POINT_BUDGET = int(os.environ.get('JOURNAL_CHART_POINTS', DEFAULT_POINT_BUDGET))
+CHART_DOWNSAMPLING = os.environ.get('JOURNAL_CHART_DOWNSAMPLING', 'lttb')
+WEBGL_POINTS = int(os.environ.get('JOURNAL_WEBGL_POINTS', WEBGL_THRESHOLD))
+
+
+def line_figure(df, x, y, **kwargs):
+    df = downsample_frame(df, x, y, CHART_POINT_BUDGET, CHART_DOWNSAMPLING)
+    render_mode = 'webgl' if len(df) > WEBGL_POINTS else 'svg'
+    return px.line(df, x=x, y=y, render_mode=render_mode, **kwargs)
+
+
+def valuation_figure(timeseries, theme):
+    return line_figure(
+        timeseries,
+        x='Date',
+        y=['Market_Value', 'Invested', 'PnL'],
+        labels={'value': 'Amount (₹)', 'variable': ''},
+        title="Market Value, Invested Capital and P&L",
+        template=figure_templates()[theme]
+    )
+
 # Dashboard metrics
 def display_dashboard():
     st.header("📊 Investment Dashboard")
 
-    df = pd.DataFrame(st.session_state.investment_data)
-
-    # Calculate metrics
-    total_investment = df[df['Action'] == 'Buy']['Total_Value'].sum()
-    current_value = sum([
-        row['Quantity'] * row['Current_Price'] 
-        for _, row in df[df['Action'] == 'Buy'].iterrows()
-    ])
-    total_pnl = df['Unrealized_PnL'].sum()
-    pnl_percentage = (total_pnl / total_investment * 100) if total_investment > 0 else 0
+    journal = st.session_state.journal
+    metrics = cached_view('dashboard_metrics', lambda journal: journal.dashboard_metrics())
+    checkpoint('metrics', metrics.allocation)
 
     # Display metrics
     col1, col2, col3, col4 = st.columns(4)
@@ -183,70 +312,105 @@ def display_dashboard():
     with col1:
         st.metric(
             "Total Investment",
-            format_inr(total_investment),
+            format_inr(metrics.total_investment),
             help="Total amount invested"
         )
 
     with col2:
         st.metric(
             "Current Value",
-            format_inr(current_value),
+            format_inr(metrics.current_value),
             help="Current market value of holdings"
         )
 
     with col3:
         st.metric(
             "Unrealized P&L",
-            format_inr(total_pnl),
-            delta=f"{pnl_percentage:.2f}%",
+            format_inr(metrics.total_pnl),
+            delta=f"{metrics.pnl_percentage:.2f}%",
             help="Profit/Loss on current holdings"
         )
 
     with col4:
-        best_performer = df.loc[df['Unrealized_PnL'].idxmax()] if not df.empty else None
-        if best_performer is not None:
+        if metrics.best_symbol is not None:
             st.metric(
                 "Best Performer",
-                best_performer['Symbol'],
-                delta=format_inr(best_performer['Unrealized_PnL'])
+                metrics.best_symbol,
+                delta=format_inr(metrics.best_pnl)
             )
+    checkpoint('metric widgets')
 
     # Portfolio allocation chart
-    if not df.empty:
+    if len(journal):
         st.subheader("Portfolio Allocation")
 
-        # Create allocation by type
-        allocation_data = df[df['Action'] == 'Buy'].groupby('Type').agg({
-            'Total_Value': 'sum'
-        }).reset_index()
+        # Charts read the rollups, so they cost O(groups), not O(transactions)
+        allocation_data = cached_view('allocation', lambda journal: type_allocation(journal.rollup('Type')))
+        checkpoint('allocation rollup', allocation_data)
 
         if not allocation_data.empty:
-            fig = px.pie(
-                allocation_data,
-                values='Total_Value',
-                names='Type',
-                title="Investment Allocation by Type"
+            # Built once per journal version and theme, not on every rerun
+            fig = cached_view(
+                'allocation_figure',
+                lambda journal, theme: allocation_figure(allocation_data, theme),
+                st.session_state.theme
             )
-
-            # Update colors based on theme
-            if st.session_state.theme == 'dark':
-                fig.update_layout(
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    font_color='white'
-                )
+            checkpoint('allocation figure')
 
             st.plotly_chart(fig, use_container_width=True)
+            checkpoint('allocation chart')
+
+        # Monthly activity
+        st.subheader("Monthly Activity")
+        activity = cached_view('monthly_activity', lambda journal: monthly_activity(journal.rollup('Month')))
+        checkpoint('monthly rollup', activity)
+        fig = cached_view(
+            'monthly_figure',
+            lambda journal, theme: monthly_figure(activity, theme),
+            st.session_state.theme
+        )
+        checkpoint('monthly figure')
+        st.plotly_chart(fig, use_container_width=True)
+        checkpoint('monthly chart')
+
+        # Portfolio value over time (needs local price history files)
+        timeseries, price_signature = cached_portfolio_timeseries()
+        checkpoint('valuation', timeseries)
+        if timeseries is not None and not timeseries.empty:
+            st.subheader("Portfolio Value Over Time")
+            fig = cached_view(
+                'valuation_figure',
+                lambda journal, signature, theme: valuation_figure(timeseries, theme),
+                price_signature, st.session_state.theme
+            )
+            checkpoint('valuation figure')
+            st.plotly_chart(fig, use_container_width=True)
+            checkpoint('valuation chart')
 
         # Recent transactions
         st.subheader("Recent Transactions")
-        recent_df = df.head(5)[['Date', 'Symbol', 'Action', 'Quantity', 'Price', 'Rationale']]
+        recent_df = cached_view('recent_transactions', lambda journal, n: journal.recent(n)[RECENT_COLUMNS], 5)
+        checkpoint('recent transactions', recent_df)
         st.dataframe(recent_df, use_container_width=True)
+        checkpoint('recent table')
+
+INVESTMENT_TYPES = ["Stock", "Mutual Fund", "ETF", "Bond", "REIT"]
+BULK_ENTRY_COLUMNS = ['Date', 'Type', 'Symbol', 'Name', 'Action', 'Quantity', 'Price', 'Rationale', 'Outcome_Notes']
+BULK_ENTRY_ROWS = 10
+
 
-# Add transaction form
+# Add transaction page: one transaction through the form, or many through the grid
 def add_transaction():
     st.header("➕ Add New Transaction")
 
+    mode = st.radio("Entry mode", ["Single transaction", "Bulk entry"], horizontal=True)
+    if mode == "Bulk entry":
+        bulk_entry()
+    else:
+        transaction_form()
+
+
+def transaction_form():
     with st.form("transaction_form"):
         col1, col2 = st.columns(2)
 
@@ -254,7 +418,7 @@ def add_transaction():
             trans_date = st.date_input("Date", value=date.today())
             investment_type = st.selectbox(
                 "Investment Type",
-                ["Stock", "Mutual Fund", "ETF", "Bond", "REIT"]
+                INVESTMENT_TYPES
             )
             symbol = st.text_input("Symbol/Code", placeholder="e.g., TCS.NS, SBIN.NS")
             action = st.selectbox("Action", ["Buy", "Sell", "Dividend"])
@@ -295,47 +459,177 @@ def add_transaction():
                     'Unrealized_PnL': 0.0 if action == 'Sell' else 0.0
                 }
 
-                st.session_state.investment_data.append(new_transaction)
+                st.session_state.journal.append(new_transaction)
                 st.success("Transaction added successfully!")
                 st.rerun()
             else:
                 st.error("Please fill in all required fields.")
 
+
+def bulk_entry_template():
+    return pd.DataFrame({
+        'Date': pd.Series([date.today()] * BULK_ENTRY_ROWS, dtype=object),
+        'Type': pd.Series(["Stock"] * BULK_ENTRY_ROWS, dtype=object),
+        'Symbol': pd.Series([None] * BULK_ENTRY_ROWS, dtype=object),
+        'Name': pd.Series([None] * BULK_ENTRY_ROWS, dtype=object),
+        'Action': pd.Series(["Buy"] * BULK_ENTRY_ROWS, dtype=object),
+        'Quantity': pd.Series([None] * BULK_ENTRY_ROWS, dtype=np.float64),
+        'Price': pd.Series([None] * BULK_ENTRY_ROWS, dtype=np.float64),
+        'Rationale': pd.Series([None] * BULK_ENTRY_ROWS, dtype=object),
+        'Outcome_Notes': pd.Series([None] * BULK_ENTRY_ROWS, dtype=object),
+    }, columns=BULK_ENTRY_COLUMNS)
+
+
+def bulk_entry():
+    """Grid of many transactions, validated together and committed as one batch.
+
+    The editor sits inside a form, so typing or pasting rows does not rerun
+    the script; submitting validates every row in one vectorized pass (the
+    form's rules, via ``validate_transactions``) and appends the batch only
+    if all rows pass.
+    """
+    added = st.session_state.pop('bulk_entry_added', None)
+    if added:
+        st.success(f"Added {added} transactions.")
+
+    # A new key after each commit clears the grid
+    round_ = st.session_state.setdefault('bulk_entry_round', 0)
+    with st.form("bulk_entry_form"):
+        st.caption("Type or paste rows; blank rows are ignored. Total value is quantity × price.")
+        edited = st.data_editor(
+            bulk_entry_template(),
+            key=f"bulk_entry_{round_}",
+            num_rows="dynamic",
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                'Date': st.column_config.DateColumn("Date", default=date.today(), format="YYYY-MM-DD"),
+                'Type': st.column_config.SelectboxColumn("Type", options=INVESTMENT_TYPES, default="Stock"),
+                'Symbol': st.column_config.TextColumn("Symbol"),
+                'Name': st.column_config.TextColumn("Name"),
+                'Action': st.column_config.SelectboxColumn("Action", options=VALID_ACTIONS, default="Buy"),
+                'Quantity': st.column_config.NumberColumn("Quantity", min_value=0.0),
+                'Price': st.column_config.NumberColumn("Price (₹)", min_value=0.0, format="%.2f"),
+                'Rationale': st.column_config.TextColumn("Rationale"),
+                'Outcome_Notes': st.column_config.TextColumn("Outcome Notes"),
+            }
+        )
+        submitted = st.form_submit_button("Add Transactions", type="primary")
+
+    if not submitted:
+        return
+
+    # Rows with nothing but defaults filled in are left-over blanks
+    entered = edited[['Symbol', 'Name', 'Quantity', 'Price', 'Rationale', 'Outcome_Notes']]
+    rows = edited[(entered.notna() & (entered.astype(str) != '')).any(axis=1)]
+    if rows.empty:
+        st.warning("No rows to add.")
+        return
+
+    valid, errors = validate_transactions(rows, types=INVESTMENT_TYPES)
+    # Report problems against the grid's own row numbers
+    grid_rows = rows.index.to_numpy() + 1
+    errors = [(int(grid_rows[row - 1]), message) for row, message in errors]
+    if errors:
+        st.error(f"{len(errors)} problems in {len({row for row, _ in errors})} rows; nothing was added.")
+        st.dataframe(pd.DataFrame(errors, columns=['Row', 'Problem']), hide_index=True, use_container_width=True)
+        return
+
+    st.session_state.journal.extend(valid)
+    st.session_state.bulk_entry_added = len(valid)
+    st.session_state.bulk_entry_round = round_ + 1
+    st.rerun()
+
+RECENT_COLUMNS = ['Date', 'Symbol', 'Action', 'Quantity', 'Price', 'Rationale']
+
+# Display helpers
+MAX_STYLED_CELLS = 100_000
+
+
+def inr_dataframe(df, inr_columns, percent_columns=()):
+    """Show a numeric DataFrame with INR rendering applied at display time.
+
+    The frame is never copied or converted to strings, so columns stay
+    numeric and sort correctly. Small tables go through a Styler whose
+    formatters look up strings produced in bulk by ``format_inr_array``;
+    larger ones use a ``column_config`` number format that the browser
+    applies only to cells scrolled into view (without lakh grouping).
+    """
+    if df.size <= MAX_STYLED_CELLS:
+        formatters = {}
+        for col in inr_columns:
+            values = pd.unique(df[col].dropna())
+            formatters[col] = dict(zip(values, format_inr_array(values))).get
+        for col in percent_columns:
+            formatters[col] = "{:.2f}%"
+        styler = df.style.format(precision=2, na_rep='—').format(formatters, na_rep='—')
+        st.dataframe(styler, use_container_width=True)
+    else:
+        column_config = {col: st.column_config.NumberColumn(format="₹%.2f") for col in inr_columns}
+        column_config.update({col: st.column_config.NumberColumn(format="%.2f%%") for col in percent_columns})
+        st.dataframe(df, column_config=column_config, use_container_width=True)
+
 # Portfolio review
 def portfolio_review():
     st.header("📈 Portfolio Review")
 
-    df = pd.DataFrame(st.session_state.investment_data)
-
-    if df.empty:
+    if not len(st.session_state.journal):
         st.info("No transactions recorded yet. Add some transactions to see your portfolio.")
         return
 
-    # Create portfolio summary (only buy transactions)
-    portfolio_df = df[df['Action'] == 'Buy'].copy()
-
-    if not portfolio_df.empty:
-        # Group by symbol to handle multiple purchases
-        portfolio_summary = portfolio_df.groupby(['Symbol', 'Name', 'Type']).agg({
-            'Quantity': 'sum',
-            'Total_Value': 'sum',
-            'Current_Price': 'last',  # Take the latest price
-            'Unrealized_PnL': 'sum'
-        }).reset_index()
-
-        # Calculate average cost
-        portfolio_summary['Avg_Cost'] = portfolio_summary['Total_Value'] / portfolio_summary['Quantity']
-        portfolio_summary['Market_Value'] = portfolio_summary['Quantity'] * portfolio_summary['Current_Price']
-        portfolio_summary['PnL_Percent'] = ((portfolio_summary['Market_Value'] - portfolio_summary['Total_Value']) / portfolio_summary['Total_Value'] * 100)
-
-        # Format currency columns for display
-        display_df = portfolio_summary.copy()
-        for col in ['Avg_Cost', 'Current_Price', 'Market_Value', 'Total_Value', 'Unrealized_PnL']:
-            display_df[col] = display_df[col].apply(format_inr)
-        display_df['PnL_Percent'] = display_df['PnL_Percent'].apply(lambda x: f"{x:.2f}%")
+    method_label = st.radio(
+        "Cost basis method",
+        list(COST_BASIS_METHODS.keys()),
+        horizontal=True,
+        help="FIFO matches sells against the oldest lots; weighted average pools all lots"
+    )
+    method = COST_BASIS_METHODS[method_label]
 
+    # Both methods match in date order, so back-dated entries are costed where they belong
+    if method == 'average':
+        # Served from the running position book, so rendering is O(holdings)
+        portfolio_summary, realized_pnl = cached_view(
+            'positions', lambda journal: (journal.positions.frame(), journal.positions.realized_pnl())
+        )
+        open_lots = None
+    else:
+        lots = cached_view('lots', lambda journal, method: compute_lots(journal.frame(), method), method)
+        portfolio_summary = lots.holdings
+        realized_pnl = lots.realized_pnl.sum()
+        open_lots = lots.open_lots
+    checkpoint('holdings', portfolio_summary)
+
+    st.metric("Realized P&L", format_inr(realized_pnl), help="Booked gains on sells plus dividends")
+
+    # Returns analytics
+    timeseries, price_signature = cached_portfolio_timeseries()
+    returns = cached_view(
+        'returns',
+        lambda journal, signature: compute_returns(journal.frame(), timeseries),
+        price_signature
+    )
+    checkpoint('returns', returns.holding_xirr)
+    percent = lambda value: "—" if np.isnan(value) else f"{value * 100:.2f}%"
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("XIRR", percent(returns.xirr), help="Annualised money-weighted return of all cash flows")
+    col2.metric("Time-Weighted Return", percent(returns.twr), help="Return independent of when money was added; needs price history")
+    col3.metric("Max Drawdown", percent(returns.max_drawdown), help="Largest peak-to-trough fall in time-weighted value; needs price history")
+    col4.metric("Volatility", percent(returns.volatility), help="Annualised standard deviation of daily returns; needs price history")
+    checkpoint('metric widgets')
+
+    if not portfolio_summary.empty:
         st.subheader("Current Holdings")
-        st.dataframe(display_df, use_container_width=True)
+        inr_dataframe(
+            portfolio_summary.assign(XIRR=portfolio_summary['Symbol'].map(returns.holding_xirr) * 100),
+            ['Avg_Cost', 'Current_Price', 'Market_Value', 'Total_Value', 'Unrealized_PnL', 'Realized_PnL'],
+            percent_columns=['PnL_Percent', 'XIRR']
+        )
+        checkpoint('holdings table')
+
+        if open_lots is not None:
+            with st.expander(f"Open lots ({len(open_lots)})"):
+                inr_dataframe(open_lots, ['Unit_Cost', 'Current_Price', 'Unrealized_PnL'])
+            checkpoint('open lots table', open_lots)
 
         # Performance analysis
         st.subheader("Performance Analysis")
@@ -344,54 +638,125 @@ def portfolio_review():
 
         with col1:
             # Top performers
-            top_performers = portfolio_summary.nlargest(3, 'Unrealized_PnL')
+            top_performers, bottom_performers = cached_view(
+                'performers', lambda _, n, method: compute_performers(portfolio_summary, n),
+                3, method
+            )
             st.markdown("**🏆 Top Performers**")
             for _, row in top_performers.iterrows():
                 st.write(f"• {row['Symbol']}: {format_inr(row['Unrealized_PnL'])} ({row['PnL_Percent']:.1f}%)")
 
         with col2:
             # Bottom performers
-            bottom_performers = portfolio_summary.nsmallest(3, 'Unrealized_PnL')
             st.markdown("**📉 Need Attention**")
             for _, row in bottom_performers.iterrows():
                 st.write(f"• {row['Symbol']}: {format_inr(row['Unrealized_PnL'])} ({row['PnL_Percent']:.1f}%)")
+        checkpoint('performers')
 
 # Analysis section
+ANALYSIS_PAGE_SIZES = [10, 25, 50]
+OUTCOME_NOTE_FILTERS = {'All': None, 'With notes': True, 'Without notes': False}
+SEARCH_RESULT_LIMIT = 50
+
+
+def render_transaction(row):
+    with st.expander(f"{row['Symbol']} - {row['Action']} on {row['Date']:%Y-%m-%d}"):
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.markdown("**Investment Rationale:**")
+            st.write(row['Rationale'])
+            st.markdown("**Details:**")
+            st.write(f"• Type: {row['Type']}")
+            st.write(f"• Quantity: {row['Quantity']}")
+            st.write(f"• Price: {format_inr(row['Price'])}")
+            st.write(f"• Total Value: {format_inr(row['Total_Value'])}")
+
+        with col2:
+            st.markdown("**Outcome & Learnings:**")
+            if row['Outcome_Notes']:
+                st.write(row['Outcome_Notes'])
+            else:
+                st.write("*No outcome notes added yet*")
+
+            if row['Action'] == 'Buy' and row['Unrealized_PnL'] != 0:
+                pnl_color = "green" if row['Unrealized_PnL'] > 0 else "red"
+                st.markdown(f"**Current P&L:** <span style='color:{pnl_color}'>{format_inr(row['Unrealized_PnL'])}</span>", unsafe_allow_html=True)
+
+
 def investment_analysis():
     st.header("🔍 Investment Analysis")
 
-    df = pd.DataFrame(st.session_state.investment_data)
+    journal = st.session_state.journal
 
-    if df.empty:
+    if not len(journal):
         st.info("No data available for analysis.")
         return
 
+    # Full-text search
+    search_text = st.text_input(
+        "🔎 Search rationale and outcome notes",
+        placeholder="e.g. margin pressure"
+    ).strip()
+    if search_text:
+        results = cached_view(
+            'search', lambda journal, text: journal.search(text, SEARCH_RESULT_LIMIT), search_text
+        )
+        checkpoint('search', results)
+        st.caption(f"{len(results)} best matches for “{search_text}”")
+        for _, row in results.iterrows():
+            render_transaction(row)
+        checkpoint('render results')
+        return
+
     # Rationale vs Outcome Analysis
     st.subheader("💡 Learning from Decisions")
 
-    for _, row in df.iterrows():
-        with st.expander(f"{row['Symbol']} - {row['Action']} on {row['Date']}"):
-            col1, col2 = st.columns(2)
-
-            with col1:
-                st.markdown("**Investment Rationale:**")
-                st.write(row['Rationale'])
-                st.markdown("**Details:**")
-                st.write(f"• Type: {row['Type']}")
-                st.write(f"• Quantity: {row['Quantity']}")
-                st.write(f"• Price: {format_inr(row['Price'])}")
-                st.write(f"• Total Value: {format_inr(row['Total_Value'])}")
-
-            with col2:
-                st.markdown("**Outcome & Learnings:**")
-                if row['Outcome_Notes']:
-                    st.write(row['Outcome_Notes'])
-                else:
-                    st.write("*No outcome notes added yet*")
+    # Filters are applied by the store; only the current page is materialized
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        symbols = st.multiselect("Symbol", cached_view('symbols', lambda journal: journal.symbols()))
+    with col2:
+        actions = st.multiselect("Action", VALID_ACTIONS)
+    with col3:
+        notes = st.selectbox("Outcome notes", list(OUTCOME_NOTE_FILTERS))
+
+    first_date, last_date = cached_view('date_range', lambda journal: journal.date_range())
+    checkpoint('filter options')
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        date_range = st.date_input("Date range", value=(first_date, last_date))
+    with col2:
+        page_size = st.selectbox("Per page", ANALYSIS_PAGE_SIZES, index=1)
+
+    start, end = (tuple(date_range) + (None, None))[:2]
+    flt = TransactionFilter(
+        symbols=tuple(symbols),
+        actions=tuple(actions),
+        start=start,
+        end=end,
+        has_outcome_notes=OUTCOME_NOTE_FILTERS[notes]
+    )
+
+    total = cached_view('filtered_count', lambda journal, flt: journal.count(flt), flt)
+    checkpoint('count')
+    if not total:
+        st.info("No transactions match these filters.")
+        return
+
+    page_count = (total + page_size - 1) // page_size
+    page_number = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1)
+    offset = (page_number - 1) * page_size
+    page_df = cached_view(
+        'filtered_page', lambda journal, flt, offset, limit: journal.page(flt, offset, limit),
+        flt, offset, page_size
+    )
+    checkpoint('page', page_df)
+    st.caption(f"Showing {offset + 1}–{offset + len(page_df)} of {total} transactions")
 
-                if row['Action'] == 'Buy' and row['Unrealized_PnL'] != 0:
-                    pnl_color = "green" if row['Unrealized_PnL'] > 0 else "red"
-                    st.markdown(f"**Current P&L:** <span style='color:{pnl_color}'>{format_inr(row['Unrealized_PnL'])}</span>", unsafe_allow_html=True)
+    for _, row in page_df.iterrows():
+        render_transaction(row)
+    checkpoint('render page')
 
 # Data management
 def data_management():
@@ -404,51 +769,122 @@ def data_management():
 
         # File uploader
         uploaded_file = st.file_uploader(
-            "Upload CSV file",
-            type=['csv'],
-            help="Upload a CSV file with your investment data"
+            "Upload CSV, Parquet or Arrow file" if COLUMNAR_AVAILABLE else "Upload CSV file",
+            type=['csv'] + (COLUMNAR_EXTENSIONS if COLUMNAR_AVAILABLE else []),
+            help="Upload a file with your investment data"
         )
 
-        if uploaded_file is not None:
+        if uploaded_file is not None and st.button("Import", type="primary"):
+            progress_bar = st.progress(0.0, text="Importing...")
             try:
-                df = pd.read_csv(uploaded_file)
-
-                # Validate required columns
-                required_cols = ['Date', 'Type', 'Symbol', 'Name', 'Action', 'Quantity', 'Price', 'Total_Value', 'Rationale']
-                if all(col in df.columns for col in required_cols):
-                    st.session_state.investment_data = df.to_dict('records')
-                    st.success(f"Successfully imported {len(df)} transactions!")
-                    st.rerun()
+                extension = uploaded_file.name.rsplit('.', 1)[-1].lower()
+                update_progress = lambda fraction, rows: progress_bar.progress(
+                    fraction, text=f"Imported {rows:,} transactions"
+                )
+                if extension in COLUMNAR_EXTENSIONS:
+                    fmt = 'parquet' if extension == 'parquet' else 'feather'
+                    report = import_columnar(uploaded_file, st.session_state.journal, fmt, progress=update_progress)
                 else:
-                    st.error(f"CSV must contain columns: {', '.join(required_cols)}")
+                    report = import_csv(uploaded_file, st.session_state.journal, progress=update_progress)
+                st.session_state.import_report = report
+                st.rerun()
             except Exception as e:
                 st.error(f"Error reading file: {str(e)}")
 
+        report = st.session_state.pop('import_report', None)
+        if report is not None:
+            if report.rows_imported:
+                st.success(f"Successfully imported {report.rows_imported} transactions!")
+            else:
+                st.error("No valid transactions found; your journal was left unchanged.")
+            if report.rows_rejected:
+                st.warning(f"Skipped {report.rows_rejected} invalid rows.")
+                st.dataframe(
+                    pd.DataFrame(report.errors, columns=['Row', 'Error']),
+                    hide_index=True,
+                    use_container_width=True
+                )
+
+        # Broker tradebooks and CAS statements
+        st.subheader("📄 Import Broker Statements")
+        statements = st.file_uploader(
+            "Upload tradebook or CAS statements",
+            type=STATEMENT_EXTENSIONS,
+            accept_multiple_files=True,
+            help="Trades are added to the journal; ones already in it are skipped"
+        )
+        if statements and st.button("Import Statements", type="primary"):
+            with st.spinner(f"Parsing {len(statements)} statements..."):
+                # In-process: forking a pool from the threaded server risks deadlocks
+                report = import_statements(
+                    [(statement.name, statement.getvalue()) for statement in statements],
+                    st.session_state.journal,
+                    workers=1
+                )
+            st.session_state.statement_report = report
+            st.rerun()
+
+        report = st.session_state.pop('statement_report', None)
+        if report is not None:
+            st.success(
+                f"Imported {report.rows_imported} trades from {report.files_parsed} statements "
+                f"({report.duplicates} duplicates skipped)."
+            )
+            for name, error in report.failed_files:
+                st.error(f"{name}: {error}")
+            if report.rows_rejected:
+                st.warning(f"Skipped {report.rows_rejected} invalid rows.")
+                st.dataframe(
+                    pd.DataFrame(report.errors, columns=['Row', 'Error']),
+                    hide_index=True,
+                    use_container_width=True
+                )
+
         # Load sample data
         if st.button("Load Sample Data"):
-            init_session_state()
+            st.session_state.journal.clear()
+            st.session_state.journal.extend_columns(sample_columns())
             st.success("Sample data loaded!")
             st.rerun()
 
+        # Mark open positions to the latest quotes
+        st.subheader("🔄 Revalue Holdings")
+        if st.button("Refresh Current Prices", disabled=not len(st.session_state.journal)):
+            try:
+                provider = get_quote_provider()
+                updated = revalue_journal(st.session_state.journal, provider)
+                checkpoint('revalue')
+                if updated:
+                    st.success(f"Updated prices on {updated} transactions!")
+                else:
+                    st.info("No quotes found for your open positions.")
+                failed = getattr(provider.provider, 'errors', [])
+                if failed:
+                    st.warning(f"Could not fetch quotes for {sum(len(batch) for batch, _ in failed)} symbols.")
+            except Exception as e:
+                st.error(f"Error fetching quotes: {str(e)}")
+
     with col2:
         st.subheader("📤 Export Data")
 
-        if st.session_state.investment_data:
-            df = pd.DataFrame(st.session_state.investment_data)
-
-            # Prepare CSV
-            csv = df.to_csv(index=False)
+        if len(st.session_state.journal):
+            formats = list(EXPORT_FORMATS) if COLUMNAR_AVAILABLE else ['CSV']
+            export_label = st.radio("Format", formats, horizontal=True)
+            fmt, mime = EXPORT_FORMATS[export_label]
+            data = cached_view('export', lambda journal, fmt: export_journal(journal.frame(), fmt), fmt)
+            checkpoint('export')
 
             st.download_button(
-                label="📁 Download as CSV",
-                data=csv,
-                file_name=f"investment_journal_{datetime.now().strftime('%Y%m%d')}.csv",
-                mime="text/csv"
+                label=f"📁 Download as {export_label}",
+                data=data,
+                file_name=f"investment_journal_{datetime.now().strftime('%Y%m%d')}.{fmt}",
+                mime=mime
             )
 
             # Show data preview
             st.subheader("Data Preview")
-            st.dataframe(df.head(), use_container_width=True)
+            st.dataframe(st.session_state.journal.head(5), use_container_width=True)
+            checkpoint('preview')
         else:
             st.info("No data to export. Add some transactions first.")
 
@@ -456,21 +892,35 @@ def data_management():
         st.subheader("⚠️ Clear Data")
         if st.button("Clear All Data", type="secondary"):
             if st.checkbox("I understand this will delete all my data"):
-                st.session_state.investment_data = []
+                st.session_state.journal.clear()
                 st.success("All data cleared!")
                 st.rerun()
 
 # Main app
 def main():
+    # Configure page
+    st.set_page_config(
+        page_title="Personal Investment Journal",
+        page_icon="📊",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+
     # Initialize session state
     init_session_state()
 
+    # Opt-in instrumentation
+    profiler = st.session_state.profiler
+    profiler.enabled = st.session_state.profiling
+    profiler.start_rerun()
+
     # Apply CSS
     st.markdown(load_css(), unsafe_allow_html=True)
 
     # Apply theme
     theme_class = f'data-theme="{st.session_state.theme}"'
     st.markdown(f'<div {theme_class}>', unsafe_allow_html=True)
+    checkpoint('css')
 
     # Sidebar
     st.sidebar.title("🏦 Investment Journal")
@@ -479,6 +929,8 @@ def main():
     # Theme toggle
     theme_toggle()
 
+    st.sidebar.toggle("⏱️ Instrumentation", key='profiling', help="Time each stage of every rerun")
+
     st.sidebar.markdown("---")
 
     # Navigation
@@ -489,18 +941,41 @@ def main():
 
     # Currency info
     st.sidebar.info("💰 All amounts are in Indian Rupees (₹)")
-
-    # Main content
-    if page == "📊 Dashboard":
-        display_dashboard()
-    elif page == "➕ Add Transaction":
-        add_transaction()
-    elif page == "📈 Portfolio Review":
-        portfolio_review()
-    elif page == "🔍 Analysis":
-        investment_analysis()
-    elif page == "💾 Data Management":
-        data_management()
+    checkpoint('sidebar')
+
+    # Main content, with this user's journal checked out of the pool
+    with user_journal():
+        with profiler.stage(page):
+            if page == "📊 Dashboard":
+                display_dashboard()
+            elif page == "➕ Add Transaction":
+                add_transaction()
+            elif page == "📈 Portfolio Review":
+                portfolio_review()
+            elif page == "🔍 Analysis":
+                investment_analysis()
+            elif page == "💾 Data Management":
+                data_management()
+
+        # Derived view cache stats and this session's memory footprint
+        view_cache = st.session_state.view_cache
+        journal_bytes = st.session_state.journal.nbytes
+        st.sidebar.caption(
+            f"View cache: {view_cache.hits} hits · {view_cache.misses} misses · "
+            f"{len(view_cache)} views ({view_cache.nbytes / 1024:.0f} KiB)"
+        )
+        st.sidebar.caption(
+            f"Session memory ≈ {(journal_bytes + view_cache.nbytes) / 1024:.0f} KiB "
+            f"(journal {journal_bytes / 1024:.0f} KiB, views {view_cache.nbytes / 1024:.0f} KiB; "
+            "CSS, sample data and chart templates are shared)"
+        )
+        pool = get_journal_pool()
+        if pool is not None:
+            st.sidebar.caption(
+                f"Journal of {st.session_state.user_id} · {len(pool)} resident "
+                f"({pool.nbytes / 2**20:.1f} of {pool.max_bytes / 2**20:.0f} MiB) · "
+                f"{pool.opens} opens · {pool.evictions} evictions"
+            )
 
     # Footer
     st.markdown("---")
@@ -508,6 +983,10 @@ def main():
         "Built with ❤️ using Streamlit | "
         f"Theme: {'🌙 Dark' if st.session_state.theme == 'dark' else '🌞 Light'}"
     )
+    checkpoint('footer')
+
+    if profiler.enabled:
+        instrumentation_panel(profiler)
 
 if __name__ == "__main__":
     main()
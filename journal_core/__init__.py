@@ -0,0 +1,113 @@
+"""Headless core of the investment journal.
+
+Storage, aggregation, valuation, analytics, formatting and import/export,
+with no Streamlit dependency, so the same code paths run in the app, in
+batch jobs (``python -m journal_core.revalue``) and under benchmarks.
+"""
+
+from .cache import DerivedViewCache
+from .downsample import (
+    DEFAULT_POINT_BUDGET,
+    DOWNSAMPLERS,
+    WEBGL_THRESHOLD,
+    downsample_frame,
+    lttb_indices,
+    minmax_indices,
+)
+from .filters import TransactionFilter, filter_positions
+from .formatting import format_inr, format_inr_array
+from .instrumentation import StageTimer
+from .lots import COST_BASIS_METHODS, LotResult, compute_lots
+from .metrics import DashboardMetrics, compute_dashboard_metrics
+from .positions import (
+    HOLDINGS_COLUMNS,
+    Position,
+    PositionBook,
+    compute_holdings_summary,
+    compute_performers,
+)
+from .prices import (
+    PRICE_FILE_EXTENSIONS,
+    PriceHistory,
+    compute_portfolio_timeseries,
+    load_price_history,
+    price_files,
+    read_price_file,
+)
+from .quotes import (
+    QUOTE_PROVIDERS,
+    AsyncQuoteProvider,
+    CachedQuoteProvider,
+    MockQuoteProvider,
+    PriceHistoryQuoteProvider,
+    QuoteCache,
+    QuoteProvider,
+    SnapshotQuoteProvider,
+    StubQuoteProvider,
+    open_quote_provider,
+)
+from .returns import (
+    ReturnsAnalysis,
+    batched_xirr,
+    compute_period_returns,
+    compute_returns,
+    compute_xirr,
+)
+from .rollups import (
+    ROLLUP_COLUMNS,
+    ROLLUP_DIMENSIONS,
+    Rollups,
+    month_keys,
+    monthly_activity,
+    type_allocation,
+)
+from .schema import (
+    CATEGORY_COLUMNS,
+    FLOAT_COLUMNS,
+    JOURNAL_COLUMNS,
+    QUANTITY_EPSILON,
+    SAMPLE_TRANSACTIONS,
+    TEXT_COLUMNS,
+    normalize_transactions,
+    sample_columns,
+)
+from .search import SEARCH_COLUMNS, TextIndex, fts_query, tokenize
+from .statements import (
+    CAS_PDF_AVAILABLE,
+    DEDUPE_COLUMNS,
+    STATEMENT_EXTENSIONS,
+    STATEMENT_PARSERS,
+    CASParser,
+    StatementImportReport,
+    StatementParser,
+    TradebookParser,
+    detect_parser,
+    drop_duplicate_trades,
+    import_statements,
+    parse_statement,
+    parse_statements,
+)
+from .store import STORAGE_BACKENDS, SQLiteStore, TransactionStore, open_store
+from .transfer import (
+    COLUMNAR_AVAILABLE,
+    COLUMNAR_EXTENSIONS,
+    EXPORT_FORMATS,
+    IMPORT_CHUNK_ROWS,
+    REQUIRED_IMPORT_COLUMNS,
+    VALID_ACTIONS,
+    ImportReport,
+    export_journal,
+    import_columnar,
+    import_csv,
+    journal_arrow_schema,
+    journal_to_arrow,
+    validate_transactions,
+)
+from .users import (
+    DEFAULT_MAX_OPEN_STORES,
+    STORE_OVERHEAD_BYTES,
+    JournalPool,
+    open_journal_pool,
+    user_filename,
+)
+from .valuation import revalue_columns, revalue_journal
@@ -0,0 +1,88 @@
+"""Bounded LRU cache of views derived from the journal"""
+
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .lots import LotResult
+from .metrics import DashboardMetrics
+from .returns import ReturnsAnalysis
+
+
+class DerivedViewCache:
+    """Bounded LRU cache of views derived from the journal.
+
+    Entries are keyed on the journal version, which only mutations bump, so
+    reruns that do not touch the data (theme toggles, navigation) are served
+    from memory. A version change drops every entry at once.
+    """
+
+    def __init__(self, max_entries=32, max_bytes=256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._version = None
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    def clear(self):
+        self._entries.clear()
+        self._sizes.clear()
+        self._bytes = 0
+
+    def get(self, key, version, compute):
+        """Return the cached view for ``key`` at ``version``, computing it on a miss"""
+        if version != self._version:
+            self.clear()
+            self._version = version
+
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        self.misses += 1
+        value = compute()
+        size = _estimate_nbytes(value)
+        if size <= self.max_bytes:
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                old_key, _ = self._entries.popitem(last=False)
+                self._bytes -= self._sizes.pop(old_key)
+        return value
+
+
+def _estimate_nbytes(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True).sum())
+    if isinstance(value, (tuple, list)):
+        return sum(_estimate_nbytes(item) for item in value)
+    if isinstance(value, (bytes, str)):
+        return len(value)
+    if isinstance(value, DashboardMetrics):
+        return _estimate_nbytes(value.allocation)
+    if isinstance(value, ReturnsAnalysis):
+        return int(value.holding_xirr.memory_usage(index=True))
+    if isinstance(value, LotResult):
+        return _estimate_nbytes(value.open_lots) + _estimate_nbytes(value.holdings)
+    if hasattr(value, 'to_plotly_json'):
+        # Plotly figure: count the trace data arrays
+        return sum(
+            np.asarray(data).nbytes
+            for trace in value.data
+            for data in (getattr(trace, name, None) for name in ('x', 'y', 'values', 'labels'))
+            if data is not None
+        )
+    return 0
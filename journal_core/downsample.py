@@ -0,0 +1,92 @@
+"""Server-side reduction of chart series to a point budget"""
+
+import numpy as np
+
+DEFAULT_POINT_BUDGET = 2000
+WEBGL_THRESHOLD = 1000
+
+
+def _as_float(values):
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype('datetime64[ns]').view(np.int64).astype(np.float64)
+    return values.astype(np.float64)
+
+
+def lttb_indices(x, y, n_out):
+    """Row positions kept by Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept; the rest are split into
+    ``n_out - 2`` equal buckets and from each the point forming the largest
+    triangle with the previous pick and the next bucket's mean is kept,
+    which preserves peaks and troughs far better than striding.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = _as_float(x)
+    y = _as_float(y)
+    every = (n - 2) / (n_out - 2)
+    edges = (np.arange(n_out - 1) * every).astype(np.intp) + 1
+    edges[-1] = n - 1
+
+    # Prefix sums give each bucket's mean in O(1)
+    cum_x = np.concatenate(([0.0], np.cumsum(x)))
+    cum_y = np.concatenate(([0.0], np.cumsum(y)))
+
+    kept = np.empty(n_out, dtype=np.intp)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = (hi, edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        count = next_hi - next_lo
+        mean_x = (cum_x[next_hi] - cum_x[next_lo]) / count
+        mean_y = (cum_y[next_hi] - cum_y[next_lo]) / count
+        area = np.abs((x[a] - mean_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (mean_y - y[a]))
+        a = lo + int(area.argmax())
+        kept[i + 1] = a
+    return kept
+
+
+def minmax_indices(x, y, n_out):
+    """Row positions of the minimum and maximum of ``n_out // 2`` equal buckets"""
+    n = len(y)
+    buckets = n_out // 2
+    if n_out >= n or buckets < 1:
+        return np.arange(n)
+    y = _as_float(y)
+    # Bucket sizes differ by at most one and every bucket holds real rows;
+    # cells past a bucket's end (and NaNs) can never win either comparison
+    edges = np.linspace(0, n, buckets + 1).astype(np.intp)
+    starts, ends = edges[:-1], edges[1:]
+    rows = starts[:, None] + np.arange((ends - starts).max())
+    values = y[np.minimum(rows, n - 1)]
+    in_bucket = (rows < ends[:, None]) & ~np.isnan(values)
+    lows = starts + np.where(in_bucket, values, np.inf).argmin(axis=1)
+    highs = starts + np.where(in_bucket, values, -np.inf).argmax(axis=1)
+    return np.unique(np.concatenate(([0, n - 1], lows, highs)))
+
+
+DOWNSAMPLERS = {
+    'lttb': lttb_indices,
+    'minmax': minmax_indices,
+}
+
+
+def downsample_frame(df, x, columns, max_points=DEFAULT_POINT_BUDGET, method='lttb'):
+    """Rows of ``df`` to plot ``columns`` against ``x`` within ``max_points``.
+
+    Each column gets an equal share of the budget and the rows any column
+    needs are kept, so all traces still share one x axis. Frames already
+    within budget are returned unchanged.
+    """
+    if method not in DOWNSAMPLERS:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    if len(df) <= max_points or not columns:
+        return df
+    reducer = DOWNSAMPLERS[method]
+    per_column = max(3, max_points // len(columns))
+    xs = df[x].to_numpy()
+    keep = np.unique(np.concatenate([reducer(xs, df[col].to_numpy(), per_column) for col in columns]))
+    return df.iloc[keep].reset_index(drop=True)
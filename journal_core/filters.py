@@ -0,0 +1,54 @@
+"""Transaction filters, applied in memory or compiled to SQL"""
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+
+import numpy as np
+
+
+# Transaction filtering
+@dataclass(frozen=True)
+class TransactionFilter:
+    symbols: tuple = ()
+    actions: tuple = ()
+    start: Optional[date] = None
+    end: Optional[date] = None
+    has_outcome_notes: Optional[bool] = None
+
+
+def filter_positions(df, flt):
+    """Row positions of ``df`` matching ``flt``, from vectorized masks"""
+    mask = np.ones(len(df), dtype=bool)
+    if flt.symbols:
+        mask &= df['Symbol'].isin(flt.symbols).to_numpy()
+    if flt.actions:
+        mask &= df['Action'].isin(flt.actions).to_numpy()
+    dates = df['Date'].to_numpy()
+    if flt.start is not None:
+        mask &= dates >= np.datetime64(flt.start, 'ns')
+    if flt.end is not None:
+        mask &= dates < np.datetime64(flt.end, 'ns') + np.timedelta64(1, 'D')
+    if flt.has_outcome_notes is not None:
+        has_notes = (df['Outcome_Notes'].str.len() > 0).to_numpy()
+        mask &= has_notes if flt.has_outcome_notes else ~has_notes
+    return np.flatnonzero(mask)
+
+
+def _filter_sql(flt):
+    clauses, params = [], []
+    if flt.symbols:
+        clauses.append(f"Symbol IN ({', '.join('?' * len(flt.symbols))})")
+        params.extend(flt.symbols)
+    if flt.actions:
+        clauses.append(f"Action IN ({', '.join('?' * len(flt.actions))})")
+        params.extend(flt.actions)
+    if flt.start is not None:
+        clauses.append("Date >= ?")
+        params.append(flt.start.isoformat())
+    if flt.end is not None:
+        clauses.append("Date <= ?")
+        params.append(flt.end.isoformat())
+    if flt.has_outcome_notes is not None:
+        clauses.append("Outcome_Notes != ''" if flt.has_outcome_notes else "Outcome_Notes = ''")
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
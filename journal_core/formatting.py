@@ -0,0 +1,105 @@
+"""Indian Rupee formatting, scalar and vectorized"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+# Format currency in INR
+@lru_cache(maxsize=4096)
+def format_inr(amount):
+    """Format amount in Indian Rupee format"""
+    if amount == 0:
+        return "₹0.00"
+
+    # Handle negative amounts
+    is_negative = amount < 0
+    amount = abs(amount)
+
+    # Format with Indian numbering system
+    amount_str = f"{amount:,.2f}"
+
+    # Convert to Indian numbering (lakhs and crores)
+    parts = amount_str.split('.')
+    integer_part = parts[0].replace(',', '')
+    decimal_part = parts[1]
+
+    # Format according to Indian system
+    if len(integer_part) > 3:
+        last_three = integer_part[-3:]
+        remaining = integer_part[:-3]
+
+        formatted = last_three
+        while len(remaining) > 2:
+            formatted = remaining[-2:] + ',' + formatted
+            remaining = remaining[:-2]
+
+        if remaining:
+            formatted = remaining + ',' + formatted
+
+        result = f"₹{formatted}.{decimal_part}"
+    else:
+        result = f"₹{amount_str}"
+
+    return f"-{result}" if is_negative else result
+
+
+# Format a whole column in INR
+def format_inr_array(values):
+    """Vectorized ``format_inr`` for an array or Series of amounts.
+
+    Amounts are rounded to whole paise with NumPy, then the digits are laid
+    out in a character matrix so the lakh/crore commas are inserted column by
+    column for all rows at once. Values whose rounding NumPy cannot settle
+    exactly (half-paisa ties, huge or non-finite amounts) go through the
+    scalar path, so the output always matches ``format_inr``.
+    """
+    amounts = np.asarray(values, dtype=np.float64).ravel()
+    result = np.empty(len(amounts), dtype=object)
+
+    with np.errstate(invalid='ignore', over='ignore'):
+        scaled = np.abs(amounts) * 100
+        fraction = scaled - np.floor(scaled)
+        exact = (
+            np.isfinite(scaled)
+            & (scaled < 2 ** 52)
+            & (np.abs(fraction - 0.5) > 4 * np.spacing(scaled))
+        )
+
+    rows = np.flatnonzero(exact)
+    if len(rows):
+        paise = np.rint(scaled[rows]).astype(np.int64)
+        remaining = paise // 100
+        fractional = paise % 100
+
+        digit_count = len(str(int(remaining.max())))
+        comma_positions = range(3, digit_count, 2)
+        width = digit_count + len(comma_positions) + 3
+        chars = np.full((len(rows), width), ord(' '), dtype=np.uint32)
+        chars[:, -3] = ord('.')
+        chars[:, -2] = ord('0') + fractional // 10
+        chars[:, -1] = ord('0') + fractional % 10
+
+        # Fill integer digits right to left, with commas after 3 and then every 2
+        k = width - 4
+        for j in range(digit_count):
+            present = remaining > 0 if j else np.ones(len(rows), dtype=bool)
+            if j in comma_positions:
+                chars[:, k] = np.where(present, ord(','), ord(' '))
+                k -= 1
+            chars[:, k] = np.where(present, ord('0') + remaining % 10, ord(' '))
+            remaining //= 10
+            k -= 1
+
+        grouped = np.char.lstrip(chars.view(f'U{width}').ravel())
+        # Zero and sub-paisa amounts come out as ₹0.00, matching the scalar special case
+        prefix = np.where(amounts[rows] < 0, '-₹', '₹')
+        result[rows] = np.char.add(prefix, grouped).astype(object)
+
+    for i in np.flatnonzero(~exact):
+        result[i] = format_inr(float(amounts[i]))
+
+    if isinstance(values, pd.Series):
+        return pd.Series(result, index=values.index, name=values.name)
+    return result.reshape(np.shape(values))
@@ -0,0 +1,105 @@
+"""Opt-in per-rerun stage timings with rolling percentiles"""
+
+from collections import deque
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        timer = self.timer
+        timer._scopes.append(self.name)
+        self.start = timer._last = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        timer = self.timer
+        now = perf_counter()
+        path = '/'.join(timer._scopes)
+        timer._scopes.pop()
+        timer._record(path, now - self.start, None)
+        timer._last = now
+        return False
+
+
+class StageTimer:
+    """Times the stages of one rerun and keeps a rolling window per stage.
+
+    ``stage(name)`` is a context manager for a whole section (a page);
+    ``checkpoint(step, frame)`` inside it attributes the time since the
+    previous checkpoint to ``step`` and notes the size of ``frame`` if
+    given, so steps can be marked without re-indenting code. Stage names
+    nest as ``page/step``. When disabled both return immediately.
+    """
+
+    def __init__(self, enabled=False, window=100):
+        self.enabled = enabled
+        self.window = window
+        self.reruns = 0
+        self.records = []
+        self.history = {}
+        self._scopes = []
+        self._last = 0.0
+
+    def start_rerun(self):
+        self.reruns += 1
+        if self.enabled:
+            self.records = []
+            self._scopes = []
+            self._last = perf_counter()
+
+    def stage(self, name):
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def checkpoint(self, step, frame=None):
+        if not self.enabled:
+            return
+        now = perf_counter()
+        self._record('/'.join(self._scopes + [step]), now - self._last, frame)
+        self._last = now
+
+    def _record(self, name, seconds, frame):
+        shape = getattr(frame, 'shape', None)
+        rows, columns = (shape + (1,))[:2] if shape is not None else (None, None)
+        self.records.append((name, seconds, rows, columns))
+        samples = self.history.get(name)
+        if samples is None:
+            samples = self.history[name] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def breakdown(self):
+        """Stages of the last rerun in the order they finished"""
+        df = pd.DataFrame(self.records, columns=['Stage', 'Seconds', 'Rows', 'Columns'])
+        return pd.DataFrame({
+            'Stage': df['Stage'],
+            'ms': df['Seconds'] * 1000,
+            'Rows': df['Rows'].astype('Int64'),
+            'Columns': df['Columns'].astype('Int64'),
+        })
+
+    def percentiles(self):
+        """p50/p90/p99 milliseconds per stage over the rolling window"""
+        rows = []
+        for name, samples in self.history.items():
+            p50, p90, p99 = np.percentile(np.fromiter(samples, dtype=np.float64) * 1000, [50, 90, 99])
+            rows.append((name, len(samples), p50, p90, p99))
+        return pd.DataFrame(rows, columns=['Stage', 'Runs', 'p50 ms', 'p90 ms', 'p99 ms'])
@@ -0,0 +1,132 @@
+"""Lot-based (FIFO / weighted average) cost basis engine"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .positions import HOLDINGS_COLUMNS, _finish_holdings
+from .schema import QUANTITY_EPSILON
+
+
+# Lot-based cost basis engine
+COST_BASIS_METHODS = {'FIFO': 'fifo', 'Weighted Average': 'average'}
+
+
+@dataclass(frozen=True)
+class LotResult:
+    open_lots: pd.DataFrame
+    holdings: pd.DataFrame
+    realized_pnl: pd.Series
+    # Position in the input frame of the row that opened each open lot
+    open_rows: np.ndarray
+
+
+def compute_lots(df, method='fifo'):
+    """Match sells against buy lots per symbol in date order.
+
+    Transactions are sorted once by (symbol, date, entry order) and each
+    symbol's slice is walked with its lots held in preallocated arrays and a
+    head pointer, never indexing the DataFrame per row, so the whole pass is
+    linear in the journal length. With ``method='average'`` every symbol
+    keeps a single pooled lot at the weighted-average cost. Dividends are
+    booked as realized income.
+    """
+    if method not in ('fifo', 'average'):
+        raise ValueError(f"Unknown cost basis method: {method}")
+
+    n = len(df)
+    codes, uniques = pd.factorize(df['Symbol'])
+    dates = df['Date'].to_numpy(dtype='datetime64[ns]')
+    order = np.lexsort((np.arange(n), dates, codes))
+
+    codes = codes[order]
+    symbols = np.asarray(uniques, dtype=object)[codes]
+    dates = dates[order]
+    names = df['Name'].to_numpy()[order]
+    types = df['Type'].astype(str).to_numpy()[order]
+    actions = df['Action'].astype(str).to_numpy()[order].tolist()
+    quantities = df['Quantity'].to_numpy(dtype=np.float64)[order].tolist()
+    totals = df['Total_Value'].to_numpy(dtype=np.float64)[order].tolist()
+    prices = df['Current_Price'].to_numpy(dtype=np.float64)[order].tolist()
+
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if n else np.array([], dtype=int)
+    stops = np.r_[starts[1:], n].astype(int)
+
+    lot_rows, lot_qty, lot_cost = [], [], []
+    holdings, realized = [], {}
+
+    for start, stop in zip(starts.tolist(), stops.tolist()):
+        symbol = symbols[start]
+        size = stop - start
+        # Lots for this symbol: parallel preallocated arrays, consumed from ``head``
+        qty = [0.0] * size
+        cost = [0.0] * size
+        opened = [0] * size
+        head = tail = 0
+        pnl = 0.0
+        last_price = 0.0
+
+        for i in range(start, stop):
+            action = actions[i]
+            quantity = quantities[i]
+            if action == 'Dividend':
+                pnl += totals[i]
+                continue
+            last_price = prices[i]
+            if quantity <= 0:
+                continue
+
+            if action == 'Buy':
+                if method == 'average' and tail > head:
+                    pooled = qty[head] + quantity
+                    cost[head] = (qty[head] * cost[head] + totals[i]) / pooled
+                    qty[head] = pooled
+                    opened[head] = i
+                else:
+                    qty[tail] = quantity
+                    cost[tail] = totals[i] / quantity
+                    opened[tail] = i
+                    tail += 1
+            elif action == 'Sell':
+                unit_proceeds = totals[i] / quantity
+                remaining = quantity
+                while remaining > 0 and head < tail:
+                    matched = min(remaining, qty[head])
+                    pnl += matched * (unit_proceeds - cost[head])
+                    qty[head] -= matched
+                    remaining -= matched
+                    if qty[head] <= QUANTITY_EPSILON:
+                        head += 1
+
+        realized[symbol] = pnl
+        if tail > head:
+            open_qty = qty[head:tail]
+            open_cost = cost[head:tail]
+            lot_rows.extend(opened[head:tail])
+            lot_qty.extend(open_qty)
+            lot_cost.extend(open_cost)
+            holdings.append((
+                symbol, names[stop - 1], types[stop - 1], sum(open_qty),
+                sum(q * c for q, c in zip(open_qty, open_cost)), last_price, pnl
+            ))
+
+    lot_rows = np.asarray(lot_rows, dtype=np.intp)
+    open_lots = pd.DataFrame({
+        'Symbol': symbols[lot_rows].astype(object),
+        'Date': dates[lot_rows],
+        'Quantity': np.asarray(lot_qty, dtype=np.float64),
+        'Unit_Cost': np.asarray(lot_cost, dtype=np.float64),
+    })
+
+    summary = _finish_holdings(pd.DataFrame(holdings, columns=HOLDINGS_COLUMNS))
+    last_prices = summary.set_index('Symbol')['Current_Price']
+    open_lots['Current_Price'] = open_lots['Symbol'].map(last_prices).to_numpy(dtype=np.float64)
+    open_lots['Unrealized_PnL'] = open_lots['Quantity'] * (open_lots['Current_Price'] - open_lots['Unit_Cost'])
+
+    return LotResult(
+        open_lots=open_lots,
+        holdings=summary,
+        realized_pnl=pd.Series(realized, name='Realized_PnL', dtype=np.float64),
+        open_rows=order[lot_rows],
+    )
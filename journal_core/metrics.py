@@ -0,0 +1,54 @@
+"""Dashboard headline metrics"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+import pandas as pd
+
+
+# Dashboard metrics computation
+@dataclass(frozen=True)
+class DashboardMetrics:
+    total_investment: float
+    current_value: float
+    total_pnl: float
+    pnl_percentage: float
+    best_symbol: Optional[str]
+    best_pnl: float
+    allocation: pd.DataFrame
+
+
+def compute_dashboard_metrics(df):
+    """Compute the dashboard headline numbers and allocation in one vectorized pass"""
+    buy = (df['Action'] == 'Buy').to_numpy()
+    buy_values = df['Total_Value'].to_numpy()[buy]
+    buy_market = df['Quantity'].to_numpy()[buy] * df['Current_Price'].to_numpy()[buy]
+    pnl = df['Unrealized_PnL'].to_numpy()
+
+    total_investment = float(buy_values.sum())
+    total_pnl = float(pnl.sum())
+    pnl_percentage = (total_pnl / total_investment * 100) if total_investment > 0 else 0
+
+    best_symbol, best_pnl = None, 0.0
+    if buy.any():
+        buy_pnl = pnl[buy]
+        best = int(buy_pnl.argmax())
+        best_symbol = df['Symbol'].to_numpy()[buy][best]
+        best_pnl = float(buy_pnl[best])
+
+    allocation = (
+        df.loc[buy, ['Type', 'Total_Value']]
+        .groupby('Type', observed=True, sort=False)['Total_Value']
+        .sum()
+        .reset_index()
+    )
+
+    return DashboardMetrics(
+        total_investment=total_investment,
+        current_value=float(buy_market.sum()),
+        total_pnl=total_pnl,
+        pnl_percentage=pnl_percentage,
+        best_symbol=best_symbol,
+        best_pnl=best_pnl,
+        allocation=allocation,
+    )
@@ -0,0 +1,129 @@
+"""Running average-cost positions and holdings summaries"""
+
+import numpy as np
+import pandas as pd
+
+from .schema import QUANTITY_EPSILON, normalize_transactions
+
+
+# Holdings schema
+HOLDINGS_COLUMNS = [
+    'Symbol', 'Name', 'Type', 'Quantity', 'Total_Value', 'Current_Price', 'Realized_PnL'
+]
+# Journal columns a PositionBook folds, in ``PositionBook.apply`` argument order
+POSITION_COLUMNS = ['Date', 'Symbol', 'Name', 'Type', 'Action', 'Quantity', 'Total_Value', 'Current_Price']
+
+
+def _finish_holdings(summary):
+    summary['Avg_Cost'] = summary['Total_Value'] / summary['Quantity']
+    summary['Market_Value'] = summary['Quantity'] * summary['Current_Price']
+    summary['Unrealized_PnL'] = summary['Market_Value'] - summary['Total_Value']
+    summary['PnL_Percent'] = summary['Unrealized_PnL'] / summary['Total_Value'] * 100
+    return summary
+
+
+class Position:
+    __slots__ = ('name', 'type', 'quantity', 'cost_basis', 'realized_pnl', 'last_price')
+
+    def __init__(self, name, type_):
+        self.name = name
+        self.type = type_
+        self.quantity = 0.0
+        self.cost_basis = 0.0
+        self.realized_pnl = 0.0
+        self.last_price = 0.0
+
+
+class PositionBook:
+    """Running per-symbol positions, updated in O(1) per transaction.
+
+    Cost basis uses the average-cost method in date order (entry order
+    within a day), so the book matches ``compute_lots(df, 'average')``.
+    Appends dated on or after the latest date seen are folded in as they
+    arrive; ``in_order`` tells the store when a back-dated row needs the
+    book rebuilt instead. Sells release cost at the running average and
+    book the difference as realized P&L; dividends are booked as realized
+    income.
+    """
+
+    def __init__(self):
+        self._positions = {}
+        self.last_date = None
+        self.version = 0
+
+    def __len__(self):
+        return len(self._positions)
+
+    def clear(self):
+        self._positions = {}
+        self.last_date = None
+        self.version += 1
+
+    def in_order(self, date):
+        """Whether a transaction dated ``date`` can be folded in without reordering the book"""
+        return self.last_date is None or date >= self.last_date
+
+    def apply(self, date, symbol, name, type_, action, quantity, total_value, current_price):
+        """Fold one transaction into its symbol's running position"""
+        position = self._positions.get(symbol)
+        if position is None:
+            position = self._positions[symbol] = Position(name, type_)
+        position.name = name
+        position.type = type_
+        if self.last_date is None or date > self.last_date:
+            self.last_date = date
+
+        if action != 'Dividend':
+            position.last_price = current_price
+
+        if action == 'Buy' and quantity > 0:
+            position.quantity += quantity
+            position.cost_basis += total_value
+        elif action == 'Sell' and quantity > 0:
+            matched = min(quantity, position.quantity)
+            if matched > 0:
+                avg_cost = position.cost_basis / position.quantity
+                position.realized_pnl += matched * (total_value / quantity - avg_cost)
+                position.quantity -= matched
+                position.cost_basis -= matched * avg_cost
+                if position.quantity <= QUANTITY_EPSILON:
+                    position.quantity = 0.0
+                    position.cost_basis = 0.0
+        elif action == 'Dividend':
+            position.realized_pnl += total_value
+        self.version += 1
+
+    def apply_columns(self, columns):
+        """Fold normalized journal columns into the book in date order"""
+        order = np.argsort(columns['Date'], kind='stable')
+        for row in zip(*(columns[col][order] for col in POSITION_COLUMNS)):
+            self.apply(*row)
+
+    def realized_pnl(self):
+        """Total realized P&L across open and closed positions"""
+        return sum(pos.realized_pnl for pos in self._positions.values())
+
+    def frame(self):
+        """Return open holdings as a DataFrame, one row per symbol"""
+        rows = [
+            (symbol, pos.name, pos.type, pos.quantity, pos.cost_basis, pos.last_price, pos.realized_pnl)
+            for symbol, pos in self._positions.items()
+            if pos.quantity > 0
+        ]
+        return _finish_holdings(pd.DataFrame(rows, columns=HOLDINGS_COLUMNS))
+
+
+# Portfolio holdings computation
+def compute_holdings_summary(df):
+    """Aggregate the full journal into one row per open holding"""
+    book = PositionBook()
+    book.apply_columns(normalize_transactions(df))
+    return book.frame()
+
+
+def compute_performers(portfolio_summary, n):
+    """Return the top and bottom ``n`` holdings by unrealized P&L"""
+    return (
+        portfolio_summary.nlargest(n, 'Unrealized_PnL'),
+        portfolio_summary.nsmallest(n, 'Unrealized_PnL')
+    )
@@ -0,0 +1,124 @@
+"""Local price history and daily portfolio valuation"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# Price history and time-series valuation
+PRICE_FILE_EXTENSIONS = ('.csv', '.parquet')
+
+
+class PriceHistory:
+    """Daily closing prices held as a dense date × symbol matrix.
+
+    ``closes[i, j]`` is the close of ``symbols[j]`` on ``dates[i]``, NaN
+    where no price was recorded.
+    """
+
+    def __init__(self, frame):
+        frame = frame.dropna(subset=['Close'])
+        self.dates, date_index = np.unique(
+            pd.to_datetime(frame['Date']).to_numpy(dtype='datetime64[D]'), return_inverse=True
+        )
+        symbol_codes, symbols = pd.factorize(frame['Symbol'].astype(str).str.strip().str.upper())
+        self.symbols = list(symbols)
+        self.closes = np.full((len(self.dates), len(self.symbols)), np.nan)
+        self.closes[date_index, symbol_codes] = frame['Close'].to_numpy(dtype=np.float64)
+        self._columns = {symbol: j for j, symbol in enumerate(self.symbols)}
+
+    def __len__(self):
+        return len(self.dates)
+
+    def aligned(self, symbols):
+        """Forward-filled closes for ``symbols`` (NaN until a symbol's first close)"""
+        columns = np.array([self._columns.get(symbol, -1) for symbol in symbols], dtype=np.intp)
+        closes = np.full((len(self.dates), len(symbols)), np.nan)
+        known = columns >= 0
+        closes[:, known] = self.closes[:, columns[known]]
+
+        # Forward fill: carry the row index of the last seen price down each column
+        rows = np.where(np.isnan(closes), 0, np.arange(len(self.dates))[:, None])
+        np.maximum.accumulate(rows, axis=0, out=rows)
+        return closes[rows, np.arange(len(symbols))]
+
+
+def read_price_file(path):
+    """Read one CSV/Parquet price file in long (Date, Symbol, Close) or per-symbol form"""
+    df = pd.read_parquet(path) if path.endswith('.parquet') else pd.read_csv(path)
+    df = df.rename(columns={col: col.strip().title().replace(' ', '_') for col in df.columns})
+    if 'Close' not in df.columns:
+        df = df.rename(columns={'Adj_Close': 'Close', 'Price': 'Close'})
+    if 'Symbol' not in df.columns:
+        df['Symbol'] = os.path.splitext(os.path.basename(path))[0]
+    return df[['Date', 'Symbol', 'Close']]
+
+
+def price_files(directory):
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith(PRICE_FILE_EXTENSIONS)
+    )
+
+
+def load_price_history(directory):
+    """Load every price file in ``directory``; None when there are none"""
+    paths = price_files(directory)
+    if not paths:
+        return None
+    return PriceHistory(pd.concat([read_price_file(path) for path in paths], ignore_index=True))
+
+
+def compute_portfolio_timeseries(df, prices):
+    """Daily market value, invested capital and P&L for the whole journal.
+
+    Signed quantities and cash flows are scattered onto the price calendar
+    (a transaction counts from the first trading day on or after its date),
+    cumulated down the date axis and multiplied with the forward-filled
+    close matrix, so the cost is a handful of array passes over
+    dates × symbols. Invested capital is buys minus sell proceeds; P&L
+    adds dividends received to the market value above that.
+    """
+    empty = pd.DataFrame(columns=['Date', 'Market_Value', 'Invested', 'PnL'])
+    if prices is None or not len(prices) or df.empty:
+        return empty
+
+    symbol_codes, symbols = pd.factorize(df['Symbol'].astype(str))
+    txn_dates = df['Date'].to_numpy(dtype='datetime64[D]')
+    start = np.searchsorted(prices.dates, txn_dates.min())
+    dates = prices.dates[start:]
+    if not len(dates):
+        return empty
+
+    day = np.searchsorted(dates, txn_dates)
+    on_calendar = day < len(dates)
+    day, symbol_codes = day[on_calendar], symbol_codes[on_calendar]
+    action = df['Action'].to_numpy()[on_calendar]
+    quantity = df['Quantity'].to_numpy(dtype=np.float64)[on_calendar]
+    total = df['Total_Value'].to_numpy(dtype=np.float64)[on_calendar]
+
+    is_buy = action == 'Buy'
+    is_sell = action == 'Sell'
+    signed_quantity = np.where(is_buy, quantity, np.where(is_sell, -quantity, 0.0))
+    cash_in = np.where(is_buy, total, np.where(is_sell, -total, 0.0))
+    dividends = np.where(action == 'Dividend', total, 0.0)
+
+    positions = np.zeros((len(dates), len(symbols)))
+    np.add.at(positions, (day, symbol_codes), signed_quantity)
+    np.cumsum(positions, axis=0, out=positions)
+    np.maximum(positions, 0, out=positions)
+
+    closes = np.nan_to_num(prices.aligned(list(symbols))[start:])
+    market_value = (positions * closes).sum(axis=1)
+    invested = np.cumsum(np.bincount(day, weights=cash_in, minlength=len(dates)))
+    received = np.cumsum(np.bincount(day, weights=dividends, minlength=len(dates)))
+
+    return pd.DataFrame({
+        'Date': dates.astype('datetime64[ns]'),
+        'Market_Value': market_value,
+        'Invested': invested,
+        'PnL': market_value - invested + received,
+    })
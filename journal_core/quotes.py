@@ -0,0 +1,219 @@
+"""Quote providers: local snapshots, price history, mocks and async batched sources"""
+
+import asyncio
+import os
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .prices import load_price_history
+
+
+# Quote providers and batch revaluation
+class QuoteProvider:
+    """Source of a latest-price snapshot.
+
+    ``get_quotes(symbols)`` returns ``{symbol: price}``; symbols without a
+    price are left out rather than mapped to NaN.
+    """
+
+    def get_quotes(self, symbols):
+        raise NotImplementedError
+
+
+class SnapshotQuoteProvider(QuoteProvider):
+    """Quotes from a local CSV/Parquet file of ``Symbol, Price`` rows.
+
+    A price-history file works too: with a ``Date`` column the latest row
+    per symbol is used.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._quotes = None
+
+    def get_quotes(self, symbols):
+        if self._quotes is None:
+            df = pd.read_parquet(self.path) if self.path.endswith('.parquet') else pd.read_csv(self.path)
+            df = df.rename(columns={col: col.strip().title().replace(' ', '_') for col in df.columns})
+            if 'Price' not in df.columns:
+                # OHLC files often carry both closes; prefer the adjusted one
+                df = df.rename(columns={'Adj_Close' if 'Adj_Close' in df.columns else 'Close': 'Price'})
+            if 'Date' in df.columns:
+                df = df.sort_values('Date', kind='stable')
+            df = df.dropna(subset=['Price'])
+            symbols_col = df['Symbol'].astype(str).str.strip().str.upper()
+            self._quotes = df['Price'].astype(float).groupby(symbols_col.to_numpy()).last().to_dict()
+        return {symbol: self._quotes[symbol] for symbol in symbols if symbol in self._quotes}
+
+
+class PriceHistoryQuoteProvider(QuoteProvider):
+    """Latest forward-filled close from a PriceHistory"""
+
+    def __init__(self, prices):
+        self.prices = prices
+
+    def get_quotes(self, symbols):
+        symbols = list(symbols)
+        if self.prices is None or not len(self.prices) or not symbols:
+            return {}
+        latest = self.prices.aligned(symbols)[-1]
+        return {symbol: float(price) for symbol, price in zip(symbols, latest) if not np.isnan(price)}
+
+
+class MockQuoteProvider(QuoteProvider):
+    """Offline quotes: fixed prices from ``quotes``, otherwise a stable
+    pseudo-random price derived from the symbol name."""
+
+    def __init__(self, quotes=None):
+        self.quotes = dict(quotes or {})
+
+    def get_quotes(self, symbols):
+        return {
+            symbol: self.quotes.get(symbol, 50.0 + zlib.crc32(symbol.encode()) % 495_000 / 100)
+            for symbol in symbols
+        }
+
+
+class AsyncQuoteProvider(QuoteProvider):
+    """Base for remote sources that quote many symbols per request.
+
+    Subclasses implement ``fetch_batch(symbols)`` as a coroutine returning
+    ``{symbol: price}``. ``get_quotes`` splits the symbols into batches of
+    ``batch_size``, runs at most ``max_concurrency`` of them at once and
+    retries a failed batch ``retries`` times with exponential backoff.
+    Batches that still fail are left out of the result and recorded in
+    ``errors``, so one bad request never blocks the rest.
+    """
+
+    batch_size = 50
+    max_concurrency = 4
+    retries = 3
+    backoff = 0.5
+
+    def __init__(self):
+        self.errors = []
+
+    async def fetch_batch(self, symbols):
+        raise NotImplementedError
+
+    async def _fetch_with_retry(self, symbols, semaphore):
+        async with semaphore:
+            for attempt in range(self.retries + 1):
+                try:
+                    return await self.fetch_batch(symbols)
+                except Exception as e:
+                    if attempt == self.retries:
+                        self.errors.append((tuple(symbols), str(e)))
+                        return {}
+                    await asyncio.sleep(self.backoff * 2 ** attempt)
+
+    async def get_quotes_async(self, symbols):
+        symbols = list(dict.fromkeys(symbols))
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        batches = [symbols[i:i + self.batch_size] for i in range(0, len(symbols), self.batch_size)]
+        quotes = {}
+        for result in await asyncio.gather(*(self._fetch_with_retry(batch, semaphore) for batch in batches)):
+            quotes.update(result)
+        return quotes
+
+    def get_quotes(self, symbols):
+        self.errors = []
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.get_quotes_async(symbols))
+        # Called from inside an event loop: run ours on a worker thread
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, self.get_quotes_async(symbols)).result()
+
+
+class StubQuoteProvider(AsyncQuoteProvider):
+    """Local stand-in for a remote quote API, for tests and demos.
+
+    Answers with MockQuoteProvider prices after ``latency`` seconds per
+    batch, and fails the first ``failures`` requests to exercise retries.
+    """
+
+    backoff = 0.05
+
+    def __init__(self, quotes=None, latency=0.05, failures=0):
+        super().__init__()
+        self.mock = MockQuoteProvider(quotes)
+        self.latency = latency
+        self.failures = failures
+        self.requests = 0
+
+    async def fetch_batch(self, symbols):
+        self.requests += 1
+        request = self.requests
+        await asyncio.sleep(self.latency)
+        if request <= self.failures:
+            raise ConnectionError("stub quote service unavailable")
+        return self.mock.get_quotes(symbols)
+
+
+class QuoteCache:
+    """Thread-safe symbol → price cache whose entries expire after ``ttl`` seconds"""
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._quotes = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._quotes)
+
+    def get_many(self, symbols):
+        """Return ``(fresh quotes, symbols missing or expired)``"""
+        now = time.monotonic()
+        found, missing = {}, []
+        with self._lock:
+            for symbol in symbols:
+                entry = self._quotes.get(symbol)
+                if entry is not None and now - entry[1] < self.ttl:
+                    found[symbol] = entry[0]
+                else:
+                    missing.append(symbol)
+        return found, missing
+
+    def put_many(self, quotes):
+        now = time.monotonic()
+        with self._lock:
+            self._quotes.update((symbol, (price, now)) for symbol, price in quotes.items())
+
+
+class CachedQuoteProvider(QuoteProvider):
+    """Serve quotes from a QuoteCache, fetching only missing or expired symbols"""
+
+    def __init__(self, provider, cache):
+        self.provider = provider
+        self.cache = cache
+
+    def get_quotes(self, symbols):
+        quotes, missing = self.cache.get_many(symbols)
+        if missing:
+            fetched = self.provider.get_quotes(missing)
+            self.cache.put_many(fetched)
+            quotes.update(fetched)
+        return quotes
+
+
+QUOTE_PROVIDERS = {
+    'prices': lambda: PriceHistoryQuoteProvider(load_price_history(os.environ.get('JOURNAL_PRICES_DIR', 'prices'))),
+    'snapshot': lambda: SnapshotQuoteProvider(os.environ.get('JOURNAL_QUOTES_PATH', 'quotes.csv')),
+    'mock': lambda: MockQuoteProvider(),
+    'stub': lambda: StubQuoteProvider(),
+}
+
+
+def open_quote_provider(provider=None):
+    """Open the quote provider selected by ``JOURNAL_QUOTE_PROVIDER`` (default: prices)"""
+    provider = provider or os.environ.get('JOURNAL_QUOTE_PROVIDER', 'prices')
+    if provider not in QUOTE_PROVIDERS:
+        raise ValueError(f"Unknown quote provider: {provider}")
+    return QUOTE_PROVIDERS[provider]()
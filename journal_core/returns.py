@@ -0,0 +1,134 @@
+"""Returns analytics: XIRR, time-weighted return, drawdown and volatility"""
+
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+
+# Returns analytics
+TRADING_DAYS_PER_YEAR = 252
+
+
+@dataclass(frozen=True)
+class ReturnsAnalysis:
+    holding_xirr: pd.Series
+    xirr: float
+    twr: float = np.nan
+    max_drawdown: float = np.nan
+    volatility: float = np.nan
+
+
+def batched_xirr(amounts, years, groups, n_groups, guess=0.1, tol=1e-10, max_iter=100):
+    """Solve the XIRR of many cash-flow series at once.
+
+    ``amounts[i]`` is paid ``years[i]`` after the start of series
+    ``groups[i]``. Newton steps for every series run together, each one a
+    couple of bincount reductions over all flows. Series without both an
+    inflow and an outflow, or that do not converge, come back as NaN.
+    """
+    sign_counts = lambda mask: np.bincount(groups, weights=mask.astype(np.float64), minlength=n_groups)
+    solvable = (sign_counts(amounts > 0) > 0) & (sign_counts(amounts < 0) > 0)
+    rate = np.full(n_groups, guess)
+    converged = ~solvable
+
+    with np.errstate(over='ignore', divide='ignore', invalid='ignore'):
+        for _ in range(max_iter):
+            # Drop the flows of series that have converged
+            live = ~converged[groups]
+            if not live.all():
+                amounts, years, groups = amounts[live], years[live], groups[live]
+                if not len(groups):
+                    break
+            discounted = amounts * np.exp(-years * np.log1p(rate)[groups])
+            npv = np.bincount(groups, weights=discounted, minlength=n_groups)
+            slope = np.bincount(groups, weights=-years * discounted, minlength=n_groups) / (1 + rate)
+            step = np.where(converged | (slope == 0), 0.0, npv / slope)
+            new_rate = rate - step
+            # Never step past -100%: go halfway towards it instead
+            new_rate = np.where(new_rate <= -1, (rate - 1) / 2, new_rate)
+            converged |= np.abs(new_rate - rate) < tol
+            rate = new_rate
+
+    return np.where(solvable & converged & np.isfinite(rate), rate, np.nan)
+
+
+def compute_xirr(df, as_of=None):
+    """XIRR per symbol and for the whole journal.
+
+    Buys are outflows, sells and dividends inflows, and each open position
+    is closed out at its last Current_Price on ``as_of`` (default: today or
+    the last transaction date, whichever is later). The portfolio series is
+    every flow again under one extra group, so one solver pass covers all.
+    Returns ``(Series of rates by symbol, portfolio rate)``.
+    """
+    if df.empty:
+        return pd.Series(dtype=np.float64, name='XIRR'), np.nan
+
+    symbol_codes, symbols = pd.factorize(df['Symbol'].astype(str))
+    n = len(symbols)
+    action = df['Action'].to_numpy()
+    quantity = df['Quantity'].to_numpy(dtype=np.float64)
+    dates = df['Date'].to_numpy(dtype='datetime64[D]')
+    amounts = np.where(action == 'Buy', -1.0, 1.0) * df['Total_Value'].to_numpy(dtype=np.float64)
+
+    held = np.bincount(
+        symbol_codes,
+        weights=np.where(action == 'Buy', quantity, np.where(action == 'Sell', -quantity, 0.0)),
+        minlength=n
+    )
+    priced = np.flatnonzero(action != 'Dividend')
+    last_row = np.full(n, -1)
+    np.maximum.at(last_row, symbol_codes[priced], priced)
+    last_price = np.where(last_row >= 0, df['Current_Price'].to_numpy(dtype=np.float64)[last_row], 0.0)
+    terminal = np.maximum(held, 0) * last_price
+
+    as_of = max(np.datetime64(as_of or date.today(), 'D'), dates.max())
+    flow_amounts = np.concatenate([amounts, terminal, amounts, [terminal.sum()]])
+    flow_dates = np.concatenate([dates, np.full(n, as_of), dates, [as_of]])
+    groups = np.concatenate([symbol_codes, np.arange(n), np.full(len(df), n), [n]])
+
+    days = flow_dates.astype(np.int64)
+    start = np.full(n + 1, days.max())
+    np.minimum.at(start, groups, days)
+    years = (days - start[groups]) / 365.0
+
+    rates = batched_xirr(flow_amounts, years, groups, n + 1)
+    return pd.Series(rates[:n], index=list(symbols), name='XIRR'), float(rates[n])
+
+
+def compute_period_returns(timeseries):
+    """Daily time-weighted returns from a portfolio valuation.
+
+    Buys and sells are external flows at the day's close, so a day's
+    return is ``(value + dividends − net flow) / previous value − 1``.
+    Days starting with nothing invested are skipped.
+    """
+    market_value = timeseries['Market_Value'].to_numpy(dtype=np.float64)
+    invested = timeseries['Invested'].to_numpy(dtype=np.float64)
+    received = timeseries['PnL'].to_numpy(dtype=np.float64) - market_value + invested
+    previous = market_value[:-1]
+    held = previous > 0
+    growth = market_value[1:] + np.diff(received) - np.diff(invested)
+    return growth[held] / previous[held] - 1
+
+
+def compute_returns(df, timeseries=None, as_of=None):
+    """XIRR per holding and for the portfolio, plus TWR, max drawdown and
+    annualised volatility when a daily valuation is available"""
+    holding_xirr, xirr = compute_xirr(df, as_of)
+    if timeseries is None or len(timeseries) < 2:
+        return ReturnsAnalysis(holding_xirr, xirr)
+
+    returns = compute_period_returns(timeseries)
+    if not len(returns):
+        return ReturnsAnalysis(holding_xirr, xirr)
+    wealth = np.concatenate([[1.0], np.cumprod(1 + returns)])
+    return ReturnsAnalysis(
+        holding_xirr=holding_xirr,
+        xirr=xirr,
+        twr=float(wealth[-1] - 1),
+        max_drawdown=float((wealth / np.maximum.accumulate(wealth) - 1).min()),
+        volatility=float(returns.std(ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR)) if len(returns) > 1 else np.nan,
+    )
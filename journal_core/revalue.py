@@ -0,0 +1,69 @@
+"""Nightly batch revaluation of investment journals.
+
+Marks the open positions of every SQLite journal given on the command line
+to one price snapshot, fetched once for the union of their symbols:
+
+    python -m journal_core.revalue --quotes quotes.csv journals/*.db
+    python -m journal_core.revalue --provider prices journals/
+    python -m journal_core.revalue --provider mock investment_journal.db
+
+Directories are expanded to the ``*.db`` files they contain.
+"""
+
+import argparse
+import os
+import sys
+
+from .quotes import QUOTE_PROVIDERS, SnapshotQuoteProvider, open_quote_provider
+from .store import SQLiteStore
+
+
+def journal_paths(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            yield from sorted(
+                os.path.join(path, name) for name in os.listdir(path) if name.endswith('.db')
+            )
+        else:
+            yield path
+
+
+def revalue_journals(paths, provider):
+    """Revalue each journal against one snapshot; returns {path: rows updated}"""
+    symbols = set()
+    for path in paths:
+        store = SQLiteStore(path)
+        symbols.update(store.symbols())
+        store.close()
+
+    quotes = provider.get_quotes(sorted(symbols))
+    updated = {}
+    for path in paths:
+        store = SQLiteStore(path)
+        updated[path] = store.revalue(quotes)
+        store.close()
+    return updated
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mark journal holdings to the latest prices.")
+    parser.add_argument('journals', nargs='+', help="SQLite journal files or directories of them")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--quotes', help="CSV/Parquet snapshot of Symbol, Price rows")
+    source.add_argument('--provider', choices=sorted(QUOTE_PROVIDERS), help="Quote provider (default: JOURNAL_QUOTE_PROVIDER or prices)")
+    args = parser.parse_args(argv)
+
+    paths = list(journal_paths(args.journals))
+    missing = [path for path in paths if not os.path.isfile(path)]
+    if missing:
+        parser.error(f"journal not found: {', '.join(missing)}")
+
+    provider = SnapshotQuoteProvider(args.quotes) if args.quotes else open_quote_provider(args.provider)
+    updated = revalue_journals(paths, provider)
+    for path, rows in updated.items():
+        print(f"{path}: {rows} transactions revalued")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
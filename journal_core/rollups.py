@@ -0,0 +1,94 @@
+"""Pre-aggregated rollups of the journal by Type, Symbol and month"""
+
+import numpy as np
+import pandas as pd
+
+from .transfer import VALID_ACTIONS
+
+# Each rollup is keyed on (dimension value, Action)
+ROLLUP_DIMENSIONS = ['Type', 'Symbol', 'Month']
+ROLLUP_COLUMNS = ['Action', 'Transactions', 'Quantity', 'Total_Value']
+
+
+def month_keys(dates):
+    """'YYYY-MM' keys for an array of dates"""
+    return np.datetime_as_string(np.asarray(dates, dtype='datetime64[ns]').astype('datetime64[M]'))
+
+
+class Rollups:
+    """Running transaction count, quantity and value per group and Action.
+
+    Kept alongside ``PositionBook``: one transaction updates three groups in
+    O(1) and a batch is grouped once and folded in, so reading a rollup costs
+    O(groups) however long the journal is.
+    """
+
+    def __init__(self):
+        self._totals = {dimension: {} for dimension in ROLLUP_DIMENSIONS}
+
+    def apply(self, date, type_, symbol, action, quantity, total_value):
+        """Fold one transaction into its Type, Symbol and month groups"""
+        month = str(np.datetime64(date, 'M'))
+        for dimension, key in (('Type', type_), ('Symbol', symbol), ('Month', month)):
+            self._add(dimension, (key, action), 1, quantity, total_value)
+
+    def apply_columns(self, columns):
+        """Fold normalized journal columns in, grouping the batch first"""
+        if not len(columns['Date']):
+            return
+        df = pd.DataFrame({
+            'Type': np.asarray(columns['Type'], dtype=object),
+            'Symbol': np.asarray(columns['Symbol'], dtype=object),
+            'Month': month_keys(columns['Date']),
+            'Action': np.asarray(columns['Action'], dtype=object),
+            'Quantity': columns['Quantity'],
+            'Total_Value': columns['Total_Value'],
+        })
+        for dimension in ROLLUP_DIMENSIONS:
+            grouped = df.groupby([dimension, 'Action'], sort=False).agg(
+                Transactions=('Quantity', 'size'),
+                Quantity=('Quantity', 'sum'),
+                Total_Value=('Total_Value', 'sum'),
+            )
+            for key, count, quantity, total_value in zip(
+                grouped.index, grouped['Transactions'], grouped['Quantity'], grouped['Total_Value']
+            ):
+                self._add(dimension, key, int(count), float(quantity), float(total_value))
+
+    def _add(self, dimension, key, count, quantity, total_value):
+        entry = self._totals[dimension].get(key)
+        if entry is None:
+            self._totals[dimension][key] = [count, quantity, total_value]
+        else:
+            entry[0] += count
+            entry[1] += quantity
+            entry[2] += total_value
+
+    def rows(self):
+        """``(dimension, value, Action, transactions, quantity, total value)`` per group"""
+        for dimension, totals in self._totals.items():
+            for (key, action), (count, quantity, total_value) in totals.items():
+                yield dimension, key, action, count, quantity, total_value
+
+    def frame(self, dimension):
+        """One row per (``dimension`` value, Action), sorted by both"""
+        rows = [(key, action, *entry) for (key, action), entry in self._totals[dimension].items()]
+        df = pd.DataFrame(rows, columns=[dimension] + ROLLUP_COLUMNS)
+        return df.sort_values([dimension, 'Action'], ignore_index=True)
+
+
+def type_allocation(type_rollup):
+    """Amount bought per Type, for the allocation pie"""
+    buys = type_rollup[type_rollup['Action'] == 'Buy']
+    return buys[['Type', 'Total_Value']].reset_index(drop=True)
+
+
+def monthly_activity(month_rollup):
+    """Value bought, sold and received as dividends per month, months in order"""
+    activity = (
+        month_rollup.pivot(index='Month', columns='Action', values='Total_Value')
+        .reindex(columns=VALID_ACTIONS)
+        .fillna(0.0)
+    )
+    activity.columns.name = None
+    return activity.sort_index().reset_index()
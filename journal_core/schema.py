@@ -0,0 +1,106 @@
+"""Journal schema, sample data and normalization to the store's dtypes"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+# Sample data with INR currency
+SAMPLE_TRANSACTIONS = [
+    {
+        'Date': '2024-01-15',
+        'Type': 'Stock',
+        'Symbol': 'TCS.NS',
+        'Name': 'Tata Consultancy Services',
+        'Action': 'Buy',
+        'Quantity': 10,
+        'Price': 3500.00,
+        'Total_Value': 35000.00,
+        'Rationale': 'Strong Q3 results and digital transformation demand',
+        'Outcome_Notes': 'Stock up 8% after good quarterly results',
+        'Current_Price': 3780.00,
+        'Unrealized_PnL': 2800.00
+    },
+    {
+        'Date': '2024-02-10',
+        'Type': 'Mutual Fund',
+        'Symbol': 'SBI-BLUECHIP',
+        'Name': 'SBI Bluechip Fund',
+        'Action': 'Buy',
+        'Quantity': 100,
+        'Price': 850.00,
+        'Total_Value': 85000.00,
+        'Rationale': 'Diversified large cap exposure for long term wealth creation',
+        'Outcome_Notes': 'Steady performance as expected',
+        'Current_Price': 895.50,
+        'Unrealized_PnL': 4550.00
+    },
+    {
+        'Date': '2024-03-05',
+        'Type': 'Stock',
+        'Symbol': 'INFY.NS',
+        'Name': 'Infosys Limited',
+        'Action': 'Sell',
+        'Quantity': 20,
+        'Price': 1450.00,
+        'Total_Value': 29000.00,
+        'Rationale': 'Booking profits after 25% gain, concerned about margin pressure',
+        'Outcome_Notes': 'Good exit timing, stock consolidated afterwards',
+        'Current_Price': 1420.00,
+        'Unrealized_PnL': 0.00
+    }
+]
+
+# Journal schema
+JOURNAL_COLUMNS = [
+    'Date', 'Type', 'Symbol', 'Name', 'Action', 'Quantity', 'Price',
+    'Total_Value', 'Rationale', 'Outcome_Notes', 'Current_Price', 'Unrealized_PnL', 'Order_ID'
+]
+CATEGORY_COLUMNS = ['Type', 'Symbol', 'Action']
+FLOAT_COLUMNS = ['Quantity', 'Price', 'Total_Value', 'Current_Price', 'Unrealized_PnL']
+TEXT_COLUMNS = ['Name', 'Rationale', 'Outcome_Notes', 'Order_ID']
+# Holdings within this many units of zero are closed; selling fractional
+# fund units leaves float residue of around 1e-15
+QUANTITY_EPSILON = 1e-9
+
+
+# Normalize raw journal rows to the store's dtypes
+def normalize_transactions(data):
+    """Coerce records or a DataFrame to the journal schema"""
+    df = pd.DataFrame(data)
+    out = {}
+    dates = df['Date']
+    if not pd.api.types.is_datetime64_dtype(dates):
+        dates = pd.to_datetime(dates)
+    out['Date'] = dates.to_numpy(dtype='datetime64[ns]')
+    for col in CATEGORY_COLUMNS:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            # Keep categoricals (e.g. from Arrow dictionaries) encoded
+            out[col] = df[col].array
+        else:
+            out[col] = df[col].astype(str).to_numpy(dtype=object)
+    for col in TEXT_COLUMNS:
+        values = df[col] if col in df.columns else pd.Series('', index=df.index)
+        out[col] = values.fillna('').astype(str).to_numpy(dtype=object)
+    for col in ['Quantity', 'Price', 'Total_Value']:
+        out[col] = pd.to_numeric(df[col]).to_numpy(dtype=np.float64)
+    if 'Current_Price' in df.columns:
+        out['Current_Price'] = pd.to_numeric(df['Current_Price']).fillna(df['Price']).to_numpy(dtype=np.float64)
+    else:
+        out['Current_Price'] = out['Price'].copy()
+    if 'Unrealized_PnL' in df.columns:
+        out['Unrealized_PnL'] = pd.to_numeric(df['Unrealized_PnL']).fillna(0.0).to_numpy(dtype=np.float64)
+    else:
+        out['Unrealized_PnL'] = np.zeros(len(df))
+    return out
+
+
+@lru_cache(maxsize=1)
+def sample_columns():
+    """Normalized sample journal, built once per process and shared read-only"""
+    columns = normalize_transactions(SAMPLE_TRANSACTIONS)
+    for values in columns.values():
+        if isinstance(values, np.ndarray):
+            values.flags.writeable = False
+    return columns
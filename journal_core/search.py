@@ -0,0 +1,110 @@
+"""BM25 full-text search over rationale and outcome notes"""
+
+import re
+from array import array
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+
+# Full-text search over Rationale and Outcome_Notes
+SEARCH_COLUMNS = ['Rationale', 'Outcome_Notes']
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(text.lower())
+
+
+class TextIndex:
+    """Inverted index over free text, ranked with BM25.
+
+    Each token maps to compact typed arrays of document ids and term
+    frequencies, so adding a document costs O(its tokens) and a query only
+    touches the postings of its own terms.
+    """
+
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self):
+        self._postings = {}
+        self._lengths = array('I')
+        self._total_length = 0
+
+    def __len__(self):
+        return len(self._lengths)
+
+    def add(self, text):
+        """Index ``text`` as the next document id"""
+        doc = len(self._lengths)
+        counts = Counter(tokenize(text))
+        for token, count in counts.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = (array('I'), array('H'))
+            postings[0].append(doc)
+            postings[1].append(min(count, 0xFFFF))
+        length = sum(counts.values())
+        self._lengths.append(length)
+        self._total_length += length
+
+    def add_many(self, texts):
+        """Index many documents at once, counting tokens with vectorized ops"""
+        texts = pd.Series(list(texts), dtype=object)
+        if not len(texts):
+            return
+        start = len(self._lengths)
+        tokens = texts.str.lower().str.findall(_TOKEN_RE.pattern)
+        lengths = tokens.str.len().to_numpy(dtype=np.int64)
+
+        exploded = tokens.explode().dropna()
+        docs = exploded.index.to_numpy(dtype=np.int64) + start
+        codes, uniques = pd.factorize(exploded.to_numpy())
+        stride = start + len(texts)
+        pairs, counts = np.unique(codes.astype(np.int64) * stride + docs, return_counts=True)
+        pair_codes = pairs // stride
+        pair_docs = (pairs % stride).astype(np.uint32)
+        counts = np.minimum(counts, 0xFFFF).astype(np.uint16)
+
+        bounds = np.flatnonzero(np.r_[True, pair_codes[1:] != pair_codes[:-1], True])
+        for lo, hi in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            token = uniques[pair_codes[lo]]
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = (array('I'), array('H'))
+            postings[0].frombytes(pair_docs[lo:hi].tobytes())
+            postings[1].frombytes(counts[lo:hi].tobytes())
+
+        self._lengths.frombytes(lengths.astype(np.uint32).tobytes())
+        self._total_length += int(lengths.sum())
+
+    def search(self, query, limit=50):
+        """Return ``(doc_ids, scores)`` of the best matches, best first"""
+        n = len(self._lengths)
+        terms = [term for term in set(tokenize(query)) if term in self._postings]
+        if not n or not terms:
+            return np.array([], dtype=np.intp), np.array([])
+
+        lengths = np.array(self._lengths, dtype=np.float64)
+        norm = self.k1 * (1 - self.b + self.b * lengths / (self._total_length / n))
+        scores = np.zeros(n)
+        for term in terms:
+            docs = np.array(self._postings[term][0], dtype=np.intp)
+            tf = np.array(self._postings[term][1], dtype=np.float64)
+            idf = np.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            scores[docs] += idf * tf * (self.k1 + 1) / (tf + norm[docs])
+
+        hits = np.flatnonzero(scores > 0)
+        top = hits[np.argsort(-scores[hits], kind='stable')[:limit]]
+        return top, scores[top]
+
+
+def _search_text(columns):
+    return (r + ' ' + o for r, o in zip(columns['Rationale'], columns['Outcome_Notes']))
+
+
+def fts_query(text):
+    """Turn free text into an FTS5 query that ORs the quoted tokens"""
+    return ' OR '.join(f'"{token}"' for token in dict.fromkeys(tokenize(text)))
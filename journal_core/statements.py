@@ -0,0 +1,314 @@
+"""Broker tradebook and mutual fund CAS statement import.
+
+Parser plugins map each statement layout to journal rows; the batch
+importer parses many statements in a process pool, drops trades already
+seen and merges the rest into a store in one transaction:
+
+    python -m journal_core.statements statements/ --journal investment_journal.db
+    python -m journal_core.statements tradebook-2023.csv cas.csv --journal journals/alice.db
+
+Directories are expanded to the statement files they contain.
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from io import BytesIO, StringIO
+
+import numpy as np
+import pandas as pd
+
+from .schema import JOURNAL_COLUMNS
+from .transfer import MAX_REPORTED_ERRORS, ImportReport, validate_transactions
+
+# CAS PDFs are decrypted and parsed by casparser when it is installed
+try:
+    import casparser
+except ImportError:
+    casparser = None
+
+CAS_PDF_AVAILABLE = casparser is not None
+STATEMENT_EXTENSIONS = ['csv'] + (['pdf'] if CAS_PDF_AVAILABLE else [])
+
+# A trade is the same trade in two statements when all of these match
+DEDUPE_COLUMNS = ['Date', 'Symbol', 'Quantity', 'Price', 'Order_ID']
+# Statement rows and stored rows are compared with the keys in these types
+DEDUPE_DTYPES = {'Date': 'datetime64[ns]', 'Symbol': str, 'Quantity': float, 'Price': float, 'Order_ID': str}
+
+
+def _numbers(values):
+    return pd.to_numeric(values.fillna('').str.replace(',', '', regex=False), errors='coerce')
+
+
+class StatementParser:
+    """Maps one statement layout to raw journal rows.
+
+    ``columns`` are the (lower-cased) header fields that identify the
+    layout. ``parse`` returns the journal's input columns plus ``Order_ID``;
+    values are left for ``validate_transactions`` to check.
+    """
+
+    name = None
+    columns = ()
+
+    def matches(self, header):
+        return set(self.columns) <= set(header)
+
+    def parse(self, raw):
+        raise NotImplementedError
+
+
+class TradebookParser(StatementParser):
+    """Equity tradebook CSV as downloaded from the broker's console"""
+
+    name = 'tradebook'
+    columns = ('symbol', 'trade_date', 'exchange', 'trade_type', 'quantity', 'price', 'order_id')
+    exchange_suffixes = {'NSE': '.NS', 'BSE': '.BO'}
+
+    def parse(self, raw):
+        symbol = raw['symbol'].fillna('').str.strip().str.upper()
+        suffix = raw['exchange'].fillna('').str.strip().str.upper().map(self.exchange_suffixes).fillna('')
+        return pd.DataFrame({
+            'Date': raw['trade_date'],
+            'Type': 'Stock',
+            'Symbol': symbol + suffix,
+            'Name': symbol,
+            'Action': raw['trade_type'].fillna('').str.strip().str.capitalize(),
+            'Quantity': _numbers(raw['quantity']),
+            'Price': _numbers(raw['price']),
+            'Rationale': '',
+            'Outcome_Notes': '',
+            'Order_ID': raw['order_id'].fillna(''),
+        })
+
+
+class CASParser(StatementParser):
+    """Mutual fund Consolidated Account Statement in casparser's CSV layout.
+
+    Purchases, SIPs, switch-ins and reinvested dividends become buys;
+    redemptions and switch-outs become sells; paid-out dividends become
+    dividends of one unit at the amount paid. Tax and other non-trade
+    rows are dropped. Schemes are keyed by ISIN and the folio stands in
+    for the order id.
+    """
+
+    name = 'cas'
+    columns = ('scheme', 'isin', 'folio', 'date', 'type', 'units', 'nav', 'amount')
+    actions = {
+        'PURCHASE': 'Buy',
+        'PURCHASE_SIP': 'Buy',
+        'SWITCH_IN': 'Buy',
+        'SWITCH_IN_MERGER': 'Buy',
+        'DIVIDEND_REINVEST': 'Buy',
+        'REDEMPTION': 'Sell',
+        'SWITCH_OUT': 'Sell',
+        'SWITCH_OUT_MERGER': 'Sell',
+        'DIVIDEND_PAYOUT': 'Dividend',
+    }
+
+    def parse(self, raw):
+        action = raw['type'].fillna('').str.strip().str.upper().map(self.actions)
+        raw, action = raw[action.notna()], action[action.notna()]
+        dividend = (action == 'Dividend').to_numpy()
+        units = _numbers(raw['units']).abs()
+        nav = _numbers(raw['nav'])
+        amount = _numbers(raw['amount']).abs()
+        return pd.DataFrame({
+            'Date': raw['date'],
+            'Type': 'Mutual Fund',
+            'Symbol': raw['isin'].fillna('').str.strip().str.upper(),
+            'Name': raw['scheme'].fillna('').str.strip(),
+            'Action': action,
+            'Quantity': np.where(dividend, 1.0, units),
+            'Price': np.where(dividend, amount, nav),
+            'Rationale': '',
+            'Outcome_Notes': '',
+            'Order_ID': raw['folio'].fillna('').str.strip(),
+        })
+
+
+STATEMENT_PARSERS = {
+    'tradebook': TradebookParser(),
+    'cas': CASParser(),
+}
+
+
+def detect_parser(header):
+    """The parser whose identifying columns all appear in ``header``, or None"""
+    header = [str(col).strip().lower() for col in header]
+    for parser in STATEMENT_PARSERS.values():
+        if parser.matches(header):
+            return parser
+    return None
+
+
+def read_statement(source, name, password=None):
+    """Raw statement rows as text, with lower-cased column names"""
+    if name.lower().endswith('.pdf'):
+        if casparser is None:
+            raise ValueError("reading CAS PDFs requires the casparser package")
+        password = password or os.environ.get('JOURNAL_CAS_PASSWORD', '')
+        source = StringIO(casparser.read_cas_pdf(source, password, output='csv'))
+    raw = pd.read_csv(source, dtype=str, keep_default_na=False, na_values=[''])
+    raw.columns = raw.columns.str.strip().str.lower()
+    return raw
+
+
+def parse_statement(source, name=None, password=None):
+    """Journal rows (plus ``Order_ID`` and ``Source``) from one statement.
+
+    ``source`` is a path or the file's bytes; ``name`` defaults to the
+    path's file name and is used for PDF detection and error reports.
+    """
+    name = name or os.path.basename(source)
+    if isinstance(source, bytes):
+        source = BytesIO(source)
+    raw = read_statement(source, name, password)
+    parser = detect_parser(raw.columns)
+    if parser is None:
+        raise ValueError(f"unrecognised statement layout (columns: {', '.join(raw.columns)})")
+    rows = parser.parse(raw).reset_index(drop=True)
+    rows['Source'] = name
+    rows['Line'] = rows.index + 1
+    return rows
+
+
+def _parse_job(job):
+    # Runs in a worker process; failures come back as data, not exceptions
+    source, name, password = job
+    try:
+        return name, parse_statement(source, name, password), None
+    except Exception as e:
+        return name, None, str(e)
+
+
+def parse_statements(sources, workers=None, password=None):
+    """Parse statements in a process pool; returns ``[(name, rows or None, error or None)]``.
+
+    ``sources`` are paths or ``(name, bytes)`` pairs. A single statement,
+    or ``workers=1``, is parsed in-process.
+    """
+    jobs = []
+    for source in sources:
+        if isinstance(source, tuple):
+            name, data = source
+            jobs.append((data, name, password))
+        else:
+            jobs.append((source, os.path.basename(source), password))
+    if len(jobs) < 2 or workers == 1:
+        return [_parse_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_parse_job, jobs))
+
+
+def drop_duplicate_trades(rows, existing=None):
+    """Drop trades repeated across statements or already in ``existing``.
+
+    Rows with the same date, symbol, quantity, price and order id are one
+    trade seen in overlapping statements, except that identical fills
+    within one statement are genuine, so the n-th copy per statement is
+    kept once overall. Against ``existing`` journal rows, which keep the
+    order id, each key is added only beyond the count already held, so
+    re-importing a statement adds nothing while a new order with the same
+    date, quantity and price still goes in.
+    """
+    rows = rows.copy()
+    rows['Occurrence'] = rows.groupby(DEDUPE_COLUMNS + ['Source'], sort=False).cumcount()
+    rows = rows.drop_duplicates(DEDUPE_COLUMNS + ['Occurrence'])
+
+    if existing is not None and len(existing):
+        held = (
+            existing[DEDUPE_COLUMNS].astype(DEDUPE_DTYPES)
+            .value_counts()
+            .rename('Held')
+            .reset_index()
+        )
+        rows = rows.astype(DEDUPE_DTYPES)
+        rows['Occurrence'] = rows.groupby(DEDUPE_COLUMNS, sort=False).cumcount()
+        rows = rows.merge(held, on=DEDUPE_COLUMNS, how='left')
+        rows = rows[rows['Occurrence'] >= rows['Held'].fillna(0)]
+    return rows.drop(columns=['Occurrence', 'Held'], errors='ignore')
+
+
+@dataclass
+class StatementImportReport(ImportReport):
+    files_parsed: int = 0
+    duplicates: int = 0
+    failed_files: list = field(default_factory=list)
+
+
+def import_statements(sources, store, workers=None, password=None):
+    """Parse, validate and deduplicate statements, then append them to ``store`` in one batch"""
+    report = StatementImportReport()
+    frames = []
+    for name, rows, error in parse_statements(sources, workers, password):
+        if error is not None:
+            report.failed_files.append((name, error))
+        else:
+            report.files_parsed += 1
+            frames.append(rows)
+    if not frames:
+        return report
+
+    combined = pd.concat(frames, ignore_index=True)
+    valid, errors = validate_transactions(combined)
+    report.rows_rejected = len(combined) - len(valid)
+    report.errors = [
+        (f"{combined.at[row - 1, 'Source']}:{combined.at[row - 1, 'Line']}", message)
+        for row, message in errors[:MAX_REPORTED_ERRORS]
+    ]
+
+    valid = valid.join(combined['Source'])
+    unique = drop_duplicate_trades(valid, store.frame() if len(store) else None)
+    report.duplicates = len(valid) - len(unique)
+
+    store.extend(unique[JOURNAL_COLUMNS])
+    report.rows_imported = len(unique)
+    return report
+
+
+def statement_paths(paths):
+    extensions = tuple(f".{ext}" for ext in STATEMENT_EXTENSIONS)
+    for path in paths:
+        if os.path.isdir(path):
+            yield from sorted(
+                os.path.join(path, name) for name in os.listdir(path) if name.lower().endswith(extensions)
+            )
+        else:
+            yield path
+
+
+def main(argv=None):
+    from .store import SQLiteStore
+
+    parser = argparse.ArgumentParser(description="Import broker tradebooks and CAS statements into a journal.")
+    parser.add_argument('statements', nargs='+', help="Statement files or directories of them")
+    parser.add_argument('--journal', default=os.environ.get('JOURNAL_DB_PATH', 'investment_journal.db'),
+                        help="SQLite journal to merge into (default: JOURNAL_DB_PATH or investment_journal.db)")
+    parser.add_argument('--workers', type=int, help="Parser processes (default: one per CPU)")
+    parser.add_argument('--password', help="CAS PDF password (default: JOURNAL_CAS_PASSWORD)")
+    args = parser.parse_args(argv)
+
+    paths = list(statement_paths(args.statements))
+    missing = [path for path in paths if not os.path.isfile(path)]
+    if missing:
+        parser.error(f"statement not found: {', '.join(missing)}")
+
+    store = SQLiteStore(args.journal)
+    report = import_statements(paths, store, args.workers, args.password)
+    store.close()
+    for name, error in report.failed_files:
+        print(f"{name}: {error}")
+    for row, message in report.errors:
+        print(f"{row}: {message}")
+    print(
+        f"{report.files_parsed} statements: {report.rows_imported} trades imported, "
+        f"{report.duplicates} duplicates skipped, {report.rows_rejected} rows rejected"
+    )
+    return 1 if report.failed_files else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,717 @@
+"""Journal stores: in-memory columnar and SQLite-backed"""
+
+import os
+import sqlite3
+import sys
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from .filters import _filter_sql, filter_positions
+from .lots import compute_lots
+from .metrics import DashboardMetrics, compute_dashboard_metrics
+from .positions import POSITION_COLUMNS, PositionBook
+from .rollups import ROLLUP_DIMENSIONS, Rollups, type_allocation
+from .schema import (
+    CATEGORY_COLUMNS,
+    FLOAT_COLUMNS,
+    JOURNAL_COLUMNS,
+    SAMPLE_TRANSACTIONS,
+    TEXT_COLUMNS,
+    normalize_transactions,
+    sample_columns,
+)
+from .search import SEARCH_COLUMNS, TextIndex, _search_text, fts_query
+from .valuation import revalue_columns
+
+
+class TransactionStore:
+    """Columnar, append-only transaction store backing every page.
+
+    Columns live in preallocated NumPy arrays that grow geometrically, so
+    appending a transaction is amortized O(1). Category columns are kept as
+    integer codes. ``frame()`` hands out a typed DataFrame that is rebuilt
+    only after a mutation, so plain reruns never pay a conversion.
+    ``positions``, the rollups and the search index are updated in step
+    with appends once built; bulk loads, clears and back-dated appends to
+    ``positions`` leave them to be rebuilt on next access.
+    """
+
+    def __init__(self, data=None, capacity=1024):
+        self.version = 0
+        self._size = 0
+        self._capacity = 0
+        self._arrays = {}
+        self._categories = {col: [] for col in CATEGORY_COLUMNS}
+        self._codes = {col: {} for col in CATEGORY_COLUMNS}
+        self._frame = None
+        self._frame_version = -1
+        self._filter_key = None
+        self._filter_positions = None
+        self._positions = PositionBook()
+        self._positions_version = -1
+        self._rollups = Rollups()
+        self._rollups_version = -1
+        self._text_index = TextIndex()
+        self._text_index_version = -1
+        self._allocate(capacity)
+        if data is not None and len(data):
+            self._extend(normalize_transactions(data))
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def nbytes(self):
+        """Approximate memory held by the column buffers.
+
+        Numeric and code buffers are counted exactly; text cells are
+        estimated from up to 1,000 evenly spaced rows per column.
+        """
+        total = sum(values.nbytes for values in self._arrays.values())
+        if self._size:
+            sample = np.linspace(0, self._size - 1, min(self._size, 1000)).astype(np.intp)
+            for col in TEXT_COLUMNS:
+                sizes = [sys.getsizeof(value) for value in self._arrays[col][sample]]
+                total += int(sum(sizes) / len(sizes) * self._size)
+        return total
+
+    def _allocate(self, capacity):
+        arrays = {'Date': np.empty(capacity, dtype='datetime64[ns]')}
+        for col in CATEGORY_COLUMNS:
+            arrays[col] = np.empty(capacity, dtype=np.int32)
+        for col in TEXT_COLUMNS:
+            arrays[col] = np.empty(capacity, dtype=object)
+        for col in FLOAT_COLUMNS:
+            arrays[col] = np.empty(capacity, dtype=np.float64)
+        for col, old in self._arrays.items():
+            arrays[col][:self._size] = old[:self._size]
+        self._arrays = arrays
+        self._capacity = capacity
+
+    def _reserve(self, extra):
+        needed = self._size + extra
+        if needed > self._capacity:
+            self._allocate(max(needed, self._capacity * 2))
+
+    def _encode(self, col, values):
+        codes = self._codes[col]
+        categories = self._categories[col]
+        if isinstance(values, pd.Categorical):
+            inverse, uniques = values.codes, values.categories.astype(str)
+        else:
+            inverse, uniques = pd.factorize(values)
+        mapping = np.empty(len(uniques), dtype=np.int32)
+        for i, value in enumerate(uniques):
+            if value not in codes:
+                codes[value] = len(categories)
+                categories.append(value)
+            mapping[i] = codes[value]
+        return mapping[inverse]
+
+    def _extend(self, columns):
+        count = len(columns['Date'])
+        self._reserve(count)
+        start, stop = self._size, self._size + count
+        for col in JOURNAL_COLUMNS:
+            if col in CATEGORY_COLUMNS:
+                self._arrays[col][start:stop] = self._encode(col, columns[col])
+            else:
+                self._arrays[col][start:stop] = columns[col]
+        self._size = stop
+        in_sync = self._positions_version == self.version
+        rollups_in_sync = self._rollups_version == self.version
+        text_in_sync = self._text_index_version == self.version
+        self.version += 1
+        if in_sync and self._positions.in_order(columns['Date'].min()):
+            self._positions.apply_columns(columns)
+            self._positions_version = self.version
+        if rollups_in_sync:
+            self._rollups.apply_columns(columns)
+            self._rollups_version = self.version
+        if text_in_sync:
+            self._text_index.add_many(_search_text(columns))
+            self._text_index_version = self.version
+
+    def append(self, record):
+        """Append a single transaction record in place"""
+        self._reserve(1)
+        i = self._size
+        self._arrays['Date'][i] = np.datetime64(pd.Timestamp(record['Date']), 'ns')
+        for col in CATEGORY_COLUMNS:
+            value = str(record[col])
+            code = self._codes[col].get(value)
+            if code is None:
+                code = self._codes[col][value] = len(self._categories[col])
+                self._categories[col].append(value)
+            self._arrays[col][i] = code
+        for col in TEXT_COLUMNS:
+            self._arrays[col][i] = record.get(col) or ''
+        for col in ['Quantity', 'Price', 'Total_Value']:
+            self._arrays[col][i] = float(record[col])
+        self._arrays['Current_Price'][i] = float(record.get('Current_Price', record['Price']))
+        self._arrays['Unrealized_PnL'][i] = float(record.get('Unrealized_PnL', 0.0))
+        self._size += 1
+        in_sync = self._positions_version == self.version
+        rollups_in_sync = self._rollups_version == self.version
+        text_in_sync = self._text_index_version == self.version
+        self.version += 1
+        if rollups_in_sync:
+            self._rollups.apply(
+                self._arrays['Date'][i], str(record['Type']), str(record['Symbol']), str(record['Action']),
+                self._arrays['Quantity'][i], self._arrays['Total_Value'][i]
+            )
+            self._rollups_version = self.version
+        if text_in_sync:
+            self._text_index.add(self._arrays['Rationale'][i] + ' ' + self._arrays['Outcome_Notes'][i])
+            self._text_index_version = self.version
+        if in_sync and self._positions.in_order(self._arrays['Date'][i]):
+            self._positions.apply(
+                self._arrays['Date'][i], str(record['Symbol']), self._arrays['Name'][i], str(record['Type']),
+                str(record['Action']), self._arrays['Quantity'][i], self._arrays['Total_Value'][i],
+                self._arrays['Current_Price'][i]
+            )
+            self._positions_version = self.version
+
+    def extend(self, data):
+        """Append many transactions (records or DataFrame) in one pass"""
+        if len(data):
+            self._extend(normalize_transactions(data))
+
+    def extend_columns(self, columns):
+        """Append columns already in ``normalize_transactions`` form (copied in)"""
+        if len(columns['Date']):
+            self._extend(columns)
+
+    def replace(self, data):
+        """Replace the whole journal, e.g. after an import"""
+        # Normalize before clearing so bad data cannot leave the journal empty
+        columns = normalize_transactions(data) if len(data) else None
+        self.clear()
+        if columns is not None:
+            self._extend(columns)
+
+    def replace_chunks(self, chunks):
+        """Replace the journal with the rows of ``chunks`` (records or DataFrames).
+
+        Rows are built up in a separate store that is swapped in once every
+        chunk has been read, so a failure partway, or a stream without rows,
+        leaves the journal untouched. Returns the number of rows loaded.
+        """
+        staged = TransactionStore()
+        for chunk in chunks:
+            staged.extend(chunk)
+        if len(staged):
+            self.clear()
+            self._arrays, self._capacity, self._size = staged._arrays, staged._capacity, staged._size
+            self._categories, self._codes = staged._categories, staged._codes
+        return len(staged)
+
+    def clear(self):
+        self._size = 0
+        self._categories = {col: [] for col in CATEGORY_COLUMNS}
+        self._codes = {col: {} for col in CATEGORY_COLUMNS}
+        self.version += 1
+
+    def _column(self, col):
+        values = self._arrays[col][:self._size]
+        if col in CATEGORY_COLUMNS:
+            return np.asarray(self._categories[col], dtype=object)[values]
+        return values
+
+    @property
+    def positions(self):
+        """Running positions, rebuilt in one date-ordered pass after a bulk load or back-dated append"""
+        if self._positions_version != self.version:
+            self._positions = PositionBook()
+            self._positions.apply_columns({col: self._column(col) for col in POSITION_COLUMNS})
+            self._positions_version = self.version
+        return self._positions
+
+    @property
+    def rollups(self):
+        """Rollups by Type, Symbol and month, recomputed in one pass after a bulk load"""
+        if self._rollups_version != self.version:
+            self._rollups = Rollups()
+            self._rollups.apply_columns({col: self._column(col) for col in JOURNAL_COLUMNS})
+            self._rollups_version = self.version
+        return self._rollups
+
+    def rollup(self, dimension):
+        """Transactions, quantity and value per ``dimension`` value and Action"""
+        return self.rollups.frame(dimension)
+
+    def frame(self):
+        """Return the journal as a typed DataFrame, rebuilt only after mutations"""
+        if self._frame_version != self.version:
+            n = self._size
+            data = {}
+            for col in JOURNAL_COLUMNS:
+                values = self._arrays[col][:n]
+                if col in CATEGORY_COLUMNS:
+                    values = pd.Categorical.from_codes(values, categories=self._categories[col])
+                data[col] = values
+            self._frame = pd.DataFrame(data, columns=JOURNAL_COLUMNS, copy=False)
+            self._frame_version = self.version
+        return self._frame
+
+    def head(self, n):
+        return self.frame().head(n)
+
+    def recent(self, n):
+        return self.frame().tail(n).iloc[::-1]
+
+    def _filtered(self, flt):
+        if self._filter_key != (self.version, flt):
+            self._filter_positions = filter_positions(self.frame(), flt)
+            self._filter_key = (self.version, flt)
+        return self._filter_positions
+
+    def count(self, flt):
+        """Number of transactions matching ``flt``"""
+        return len(self._filtered(flt))
+
+    def page(self, flt, offset, limit):
+        """Rows ``offset:offset + limit`` of the transactions matching ``flt``"""
+        return self.frame().iloc[self._filtered(flt)[offset:offset + limit]]
+
+    def search(self, text, limit=50):
+        """Rank transactions by BM25 relevance of their rationale and notes"""
+        if self._text_index_version != self.version:
+            self._text_index = TextIndex()
+            self._text_index.add_many(_search_text({col: self._column(col) for col in SEARCH_COLUMNS}))
+            self._text_index_version = self.version
+        rows, scores = self._text_index.search(text, limit)
+        return self.frame().iloc[rows].assign(Score=scores)
+
+    def symbols(self):
+        return sorted(self._categories['Symbol'])
+
+    def date_range(self):
+        dates = self._arrays['Date'][:self._size]
+        if not len(dates):
+            return None, None
+        return pd.Timestamp(dates.min()).date(), pd.Timestamp(dates.max()).date()
+
+    def dashboard_metrics(self):
+        return compute_dashboard_metrics(self.frame())
+
+    def revalue(self, quotes):
+        """Mark open positions to ``quotes`` in place; returns the number of rows updated"""
+        current_price, unrealized_pnl, updated = revalue_columns(self.frame(), quotes)
+        if updated:
+            self._arrays['Current_Price'][:self._size] = current_price
+            self._arrays['Unrealized_PnL'][:self._size] = unrealized_pnl
+            # Prices are not part of any rollup or the search text
+            rollups_in_sync = self._rollups_version == self.version
+            text_in_sync = self._text_index_version == self.version
+            self.version += 1
+            if rollups_in_sync:
+                self._rollups_version = self.version
+            if text_in_sync:
+                self._text_index_version = self.version
+        return updated
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    Date TEXT NOT NULL,
+    Type TEXT NOT NULL,
+    Symbol TEXT NOT NULL,
+    Name TEXT NOT NULL,
+    Action TEXT NOT NULL,
+    Quantity REAL NOT NULL,
+    Price REAL NOT NULL,
+    Total_Value REAL NOT NULL,
+    Rationale TEXT NOT NULL DEFAULT '',
+    Outcome_Notes TEXT NOT NULL DEFAULT '',
+    Current_Price REAL NOT NULL,
+    Unrealized_PnL REAL NOT NULL DEFAULT 0,
+    Order_ID TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_symbol ON transactions (Symbol);
+CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions (Date);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0);
+CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5 (
+    Rationale, Outcome_Notes, content='transactions', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS transactions_fts_insert AFTER INSERT ON transactions BEGIN
+    INSERT INTO transactions_fts (rowid, Rationale, Outcome_Notes)
+    VALUES (new.id, new.Rationale, new.Outcome_Notes);
+END;
+CREATE TRIGGER IF NOT EXISTS transactions_fts_update AFTER UPDATE OF Rationale, Outcome_Notes ON transactions BEGIN
+    INSERT INTO transactions_fts (transactions_fts, rowid, Rationale, Outcome_Notes)
+    VALUES ('delete', old.id, old.Rationale, old.Outcome_Notes);
+    INSERT INTO transactions_fts (rowid, Rationale, Outcome_Notes)
+    VALUES (new.id, new.Rationale, new.Outcome_Notes);
+END;
+CREATE TABLE IF NOT EXISTS rollups (
+    Dimension TEXT NOT NULL,
+    Key TEXT NOT NULL,
+    Action TEXT NOT NULL,
+    Transactions INTEGER NOT NULL,
+    Quantity REAL NOT NULL,
+    Total_Value REAL NOT NULL,
+    PRIMARY KEY (Dimension, Key, Action)
+) WITHOUT ROWID;
+"""
+
+# Fold grouped deltas (see Rollups.rows) into the rollups table
+SQL_ROLLUP_UPSERT = """
+INSERT INTO rollups (Dimension, Key, Action, Transactions, Quantity, Total_Value)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (Dimension, Key, Action) DO UPDATE SET
+    Transactions = Transactions + excluded.Transactions,
+    Quantity = Quantity + excluded.Quantity,
+    Total_Value = Total_Value + excluded.Total_Value
+"""
+
+# Recompute every rollup from the transactions table
+SQL_ROLLUP_REBUILD = [
+    "DELETE FROM rollups",
+    "INSERT INTO rollups SELECT 'Type', Type, Action, COUNT(*), SUM(Quantity), SUM(Total_Value) "
+    "FROM transactions GROUP BY Type, Action",
+    "INSERT INTO rollups SELECT 'Symbol', Symbol, Action, COUNT(*), SUM(Quantity), SUM(Total_Value) "
+    "FROM transactions GROUP BY Symbol, Action",
+    "INSERT INTO rollups SELECT 'Month', substr(Date, 1, 7), Action, COUNT(*), SUM(Quantity), SUM(Total_Value) "
+    "FROM transactions GROUP BY substr(Date, 1, 7), Action",
+]
+
+# Columns compute_lots reads, for costing the open lots of quoted symbols
+LOT_COLUMNS = ['Date', 'Type', 'Symbol', 'Name', 'Action', 'Quantity', 'Total_Value', 'Current_Price']
+
+# Mark open positions to the temp ``quotes`` and ``open_lots`` tables (see revalue_columns)
+SQL_REVALUE = """
+UPDATE transactions
+SET Current_Price = quotes.Price,
+    Unrealized_PnL = COALESCE(
+        (SELECT open_lots.Quantity * (quotes.Price - open_lots.Unit_Cost)
+         FROM open_lots WHERE open_lots.id = transactions.id),
+        0)
+FROM quotes
+WHERE transactions.Symbol = quotes.Symbol
+  AND transactions.Symbol IN (SELECT Symbol FROM open_lots)
+"""
+
+# Clear leftover unrealized P&L of quoted symbols whose position is closed
+SQL_REVALUE_CLOSED = """
+UPDATE transactions
+SET Unrealized_PnL = 0
+WHERE Unrealized_PnL != 0
+  AND Symbol IN (SELECT Symbol FROM quotes)
+  AND Symbol NOT IN (SELECT Symbol FROM open_lots)
+"""
+
+_SQL_COLUMNS = ', '.join(JOURNAL_COLUMNS)
+_SQL_INSERT = f"INSERT INTO transactions ({_SQL_COLUMNS}) VALUES ({', '.join('?' * len(JOURNAL_COLUMNS))})"
+
+
+def _sql_rows(columns):
+    dates = pd.DatetimeIndex(columns['Date']).strftime('%Y-%m-%d')
+    return zip(dates, *(columns[col].tolist() for col in JOURNAL_COLUMNS[1:]))
+
+
+class SQLiteStore:
+    """Journal persisted in a SQLite file, with the TransactionStore interface.
+
+    The database runs in WAL mode so readers in other sessions never block
+    a writer. Each mutation is one transaction that also bumps a version
+    counter in the ``meta`` table; derived views and the in-memory frame are
+    keyed on it, so writes from other sessions invalidate them too. Pages
+    use the query methods to read only what they display. The ``rollups``
+    table is updated in the same transaction as every write.
+    """
+
+    def __init__(self, path, seed=None):
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        has_fts, has_rollups = (
+            self._conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,)).fetchone()
+            for name in ('transactions_fts', 'rollups')
+        )
+        with self._conn:
+            self._conn.executescript(SQLITE_SCHEMA)
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(transactions)")]
+            if 'Order_ID' not in columns:
+                # Journals created before broker order ids were kept
+                self._conn.execute("ALTER TABLE transactions ADD COLUMN Order_ID TEXT NOT NULL DEFAULT ''")
+            if not has_fts:
+                # Index rows written before the search table existed
+                self._conn.execute("INSERT INTO transactions_fts (transactions_fts) VALUES ('rebuild')")
+            if not has_rollups:
+                self._rebuild_rollups()
+        self._frame = None
+        self._frame_version = -1
+        self._positions = PositionBook()
+        self._positions_version = -1
+        if seed is not None and self.version == 0:
+            self.extend(seed)
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+
+    @property
+    def nbytes(self):
+        """Approximate memory of the rows loaded into this process (the journal itself stays on disk)"""
+        if self._frame is None:
+            return 0
+        return int(self._frame.memory_usage(index=True).sum())
+
+    @property
+    def version(self):
+        return self._conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+
+    def _bump_version(self):
+        self._conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+
+    def append(self, record):
+        """Insert a single transaction"""
+        columns = normalize_transactions([record])
+        in_sync = self._positions_version == self.version
+        rollups = Rollups()
+        rollups.apply(columns['Date'][0], columns['Type'][0], columns['Symbol'][0], columns['Action'][0],
+                      columns['Quantity'][0], columns['Total_Value'][0])
+        with self._conn:
+            self._conn.executemany(_SQL_INSERT, _sql_rows(columns))
+            self._conn.executemany(SQL_ROLLUP_UPSERT, rollups.rows())
+            self._bump_version()
+        if in_sync and self._positions.in_order(columns['Date'][0]):
+            self._positions.apply_columns(columns)
+            self._positions_version = self.version
+
+    def extend(self, data):
+        """Insert many transactions (records or DataFrame) in one transaction"""
+        if len(data):
+            self.extend_columns(normalize_transactions(data))
+
+    def extend_columns(self, columns):
+        """Insert columns already in ``normalize_transactions`` form"""
+        if len(columns['Date']):
+            rollups = Rollups()
+            rollups.apply_columns(columns)
+            with self._conn:
+                self._conn.executemany(_SQL_INSERT, _sql_rows(columns))
+                self._conn.executemany(SQL_ROLLUP_UPSERT, rollups.rows())
+                self._bump_version()
+
+    def replace(self, data):
+        """Replace the whole journal, e.g. after an import"""
+        with self._conn:
+            self._delete_all()
+            if len(data):
+                self._conn.executemany(_SQL_INSERT, _sql_rows(normalize_transactions(data)))
+                self._rebuild_rollups()
+            self._bump_version()
+
+    def replace_chunks(self, chunks):
+        """Replace the journal with the rows of ``chunks`` in one transaction.
+
+        The old rows are deleted when the first non-empty chunk arrives and
+        each chunk is inserted as it comes, so only one chunk is held in
+        memory. A failure partway rolls the whole import back, and a stream
+        without rows leaves the journal untouched. Returns the number of
+        rows inserted.
+        """
+        rows = 0
+        with self._conn:
+            for chunk in chunks:
+                if not len(chunk):
+                    continue
+                columns = normalize_transactions(chunk)
+                if not rows:
+                    self._delete_all()
+                self._conn.executemany(_SQL_INSERT, _sql_rows(columns))
+                rows += len(chunk)
+            if rows:
+                self._rebuild_rollups()
+                self._bump_version()
+        return rows
+
+    def clear(self):
+        with self._conn:
+            self._delete_all()
+            self._bump_version()
+
+    def _delete_all(self):
+        self._conn.execute("DELETE FROM transactions")
+        self._conn.execute("INSERT INTO transactions_fts (transactions_fts) VALUES ('delete-all')")
+        self._conn.execute("DELETE FROM rollups")
+
+    def _rebuild_rollups(self):
+        for sql in SQL_ROLLUP_REBUILD:
+            self._conn.execute(sql)
+
+    def rollup(self, dimension):
+        """Transactions, quantity and value per ``dimension`` value and Action"""
+        if dimension not in ROLLUP_DIMENSIONS:
+            raise ValueError(f"Unknown rollup dimension: {dimension}")
+        return pd.read_sql_query(
+            f"SELECT Key AS {dimension}, Action, Transactions, Quantity, Total_Value FROM rollups "
+            "WHERE Dimension = ? ORDER BY Key, Action",
+            self._conn, params=(dimension,)
+        )
+
+    def search(self, text, limit=50):
+        """Rank transactions by FTS5 BM25 relevance of their rationale and notes"""
+        match = fts_query(text)
+        if not match:
+            return self.query(f"SELECT {_SQL_COLUMNS} FROM transactions LIMIT 0").assign(Score=[])
+        df = pd.read_sql_query(
+            f"SELECT {', '.join('t.' + col for col in JOURNAL_COLUMNS)}, -bm25(transactions_fts) AS Score "
+            "FROM transactions_fts JOIN transactions t ON t.id = transactions_fts.rowid "
+            "WHERE transactions_fts MATCH ? ORDER BY bm25(transactions_fts) LIMIT ?",
+            self._conn, params=(match, limit)
+        )
+        return TransactionStore(df).frame().assign(Score=df['Score'].to_numpy())
+
+    def query(self, sql, params=()):
+        """Run a read query and return a typed DataFrame of journal rows"""
+        df = pd.read_sql_query(sql, self._conn, params=params)
+        return TransactionStore(df).frame() if len(df) else TransactionStore().frame()
+
+    def frame(self):
+        """Load the whole journal, cached until the version changes"""
+        version = self.version
+        if self._frame_version != version:
+            self._frame = self.query(f"SELECT {_SQL_COLUMNS} FROM transactions ORDER BY id")
+            self._frame_version = version
+        return self._frame
+
+    @property
+    def positions(self):
+        """Running positions, rebuilt by streaming rows in date order when stale"""
+        version = self.version
+        if self._positions_version != version:
+            self._positions = PositionBook()
+            cursor = self._conn.execute(
+                f"SELECT {', '.join(POSITION_COLUMNS)} FROM transactions ORDER BY Date, id"
+            )
+            for day, *row in cursor:
+                self._positions.apply(np.datetime64(day, 'ns'), *row)
+            self._positions_version = version
+        return self._positions
+
+    def head(self, n):
+        return self.query(f"SELECT {_SQL_COLUMNS} FROM transactions ORDER BY id LIMIT ?", (n,))
+
+    def recent(self, n):
+        return self.query(f"SELECT {_SQL_COLUMNS} FROM transactions ORDER BY id DESC LIMIT ?", (n,))
+
+    def count(self, flt):
+        where, params = _filter_sql(flt)
+        return self._conn.execute(f"SELECT COUNT(*) FROM transactions{where}", params).fetchone()[0]
+
+    def page(self, flt, offset, limit):
+        where, params = _filter_sql(flt)
+        return self.query(
+            f"SELECT {_SQL_COLUMNS} FROM transactions{where} ORDER BY id LIMIT ? OFFSET ?",
+            params + [limit, offset]
+        )
+
+    def symbols(self):
+        return [row[0] for row in self._conn.execute("SELECT DISTINCT Symbol FROM transactions ORDER BY Symbol")]
+
+    def date_range(self):
+        first, last = self._conn.execute("SELECT MIN(Date), MAX(Date) FROM transactions").fetchone()
+        if first is None:
+            return None, None
+        return date.fromisoformat(first), date.fromisoformat(last)
+
+    def dashboard_metrics(self):
+        total_investment, current_value, total_pnl = self._conn.execute(
+            "SELECT "
+            "COALESCE(SUM(CASE WHEN Action = 'Buy' THEN Total_Value END), 0), "
+            "COALESCE(SUM(CASE WHEN Action = 'Buy' THEN Quantity * Current_Price END), 0), "
+            "COALESCE(SUM(Unrealized_PnL), 0) "
+            "FROM transactions"
+        ).fetchone()
+        best = self._conn.execute(
+            "SELECT Symbol, Unrealized_PnL FROM transactions WHERE Action = 'Buy' "
+            "ORDER BY Unrealized_PnL DESC, id LIMIT 1"
+        ).fetchone()
+        allocation = type_allocation(self.rollup('Type'))
+        return DashboardMetrics(
+            total_investment=total_investment,
+            current_value=current_value,
+            total_pnl=total_pnl,
+            pnl_percentage=(total_pnl / total_investment * 100) if total_investment > 0 else 0,
+            best_symbol=best[0] if best else None,
+            best_pnl=best[1] if best else 0.0,
+            allocation=allocation,
+        )
+
+    def revalue(self, quotes):
+        """Mark open positions to ``quotes`` with joined UPDATEs; returns the number of rows updated.
+
+        The quoted symbols' rows are read once and walked by ``compute_lots``;
+        their open FIFO lots go to a temp table the UPDATE joins, as in
+        ``revalue_columns``.
+        """
+        quotes = {str(symbol): float(price) for symbol, price in quotes.items() if pd.notna(price)}
+        if not quotes:
+            return 0
+        with self._conn:
+            self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS quotes (Symbol TEXT PRIMARY KEY, Price REAL NOT NULL)")
+            self._conn.execute("DELETE FROM quotes")
+            self._conn.executemany("INSERT INTO quotes (Symbol, Price) VALUES (?, ?)", quotes.items())
+
+            rows = pd.read_sql_query(
+                f"SELECT id, {', '.join(LOT_COLUMNS)} FROM transactions "
+                "WHERE Symbol IN (SELECT Symbol FROM quotes) ORDER BY id",
+                self._conn
+            )
+            rows['Date'] = pd.to_datetime(rows['Date'])
+            lots = compute_lots(rows, 'fifo')
+            self._conn.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS open_lots "
+                "(id INTEGER PRIMARY KEY, Symbol TEXT NOT NULL, Quantity REAL NOT NULL, Unit_Cost REAL NOT NULL)"
+            )
+            self._conn.execute("DELETE FROM open_lots")
+            self._conn.executemany(
+                "INSERT INTO open_lots (id, Symbol, Quantity, Unit_Cost) VALUES (?, ?, ?, ?)",
+                zip(
+                    rows['id'].to_numpy()[lots.open_rows].tolist(),
+                    lots.open_lots['Symbol'].astype(str).tolist(),
+                    lots.open_lots['Quantity'].tolist(),
+                    lots.open_lots['Unit_Cost'].tolist(),
+                )
+            )
+
+            self._conn.execute(SQL_REVALUE)
+            updated = self._conn.execute("SELECT changes()").fetchone()[0]
+            self._conn.execute(SQL_REVALUE_CLOSED)
+            updated += self._conn.execute("SELECT changes()").fetchone()[0]
+            if updated:
+                self._bump_version()
+        return updated
+
+    def close(self):
+        self._conn.close()
+
+
+# Storage backends
+def _sample_store():
+    store = TransactionStore()
+    store.extend_columns(sample_columns())
+    return store
+
+
+STORAGE_BACKENDS = {
+    'sqlite': lambda: SQLiteStore(os.environ.get('JOURNAL_DB_PATH', 'investment_journal.db'), seed=SAMPLE_TRANSACTIONS),
+    'memory': _sample_store,
+}
+
+
+def open_store(backend=None):
+    """Open the journal store selected by ``JOURNAL_BACKEND`` (default: sqlite)"""
+    backend = backend or os.environ.get('JOURNAL_BACKEND', 'sqlite')
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(f"Unknown journal backend: {backend}")
+    return STORAGE_BACKENDS[backend]()
@@ -0,0 +1,247 @@
+"""Journal import and export: streamed CSV and columnar Parquet / Arrow IPC"""
+
+from dataclasses import dataclass, field
+from io import BytesIO
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+from .schema import CATEGORY_COLUMNS, FLOAT_COLUMNS, JOURNAL_COLUMNS, TEXT_COLUMNS
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet / Arrow export is optional
+    pa = None
+
+COLUMNAR_AVAILABLE = pa is not None
+
+
+# CSV import pipeline
+REQUIRED_IMPORT_COLUMNS = ['Date', 'Type', 'Symbol', 'Name', 'Action', 'Quantity', 'Price', 'Total_Value', 'Rationale']
+VALID_ACTIONS = ['Buy', 'Sell', 'Dividend']
+IMPORT_CHUNK_ROWS = 50_000
+MAX_REPORTED_ERRORS = 1_000
+
+
+@dataclass
+class ImportReport:
+    rows_imported: int = 0
+    rows_rejected: int = 0
+    errors: list = field(default_factory=list)
+
+
+def _text(values, case=None):
+    """Stripped text, optionally passed through a ``str`` case method.
+
+    Categoricals (Arrow dictionaries) are cleaned once per category and
+    stay encoded, so typed imports never expand them row by row.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        cleaned = pd.Index(values.cat.categories.astype(str).tolist() + ['']).str.strip()
+        if case:
+            cleaned = getattr(cleaned.str, case)()
+        # Code -1 (missing) picks the trailing ''
+        mapping, uniques = pd.factorize(cleaned)
+        codes = mapping[values.cat.codes.to_numpy()]
+        return pd.Series(pd.Categorical.from_codes(codes, uniques), index=values.index)
+    values = values.fillna('').astype(str).str.strip()
+    return getattr(values.str, case)() if case else values
+
+
+def validate_transactions(chunk, first_row=1, types=None, max_errors=None):
+    """Normalize a chunk of raw journal rows and split off invalid ones.
+
+    Applies the same rules as the Add Transaction form (symbol and name
+    present, quantity and price > 0), upper-cases symbols, parses dates and
+    recomputes Total_Value. When ``types`` is given, Type must be one of
+    them, as the form's selectbox guarantees. Typed columns (datetime
+    dates, float numbers, categoricals) are checked as they are, without a
+    round trip through text. Returns the valid rows and a list of (at most
+    ``max_errors``) ``(row, message)`` errors, numbering data rows from
+    ``first_row``.
+    """
+    chunk = chunk.reset_index(drop=True)
+    out = pd.DataFrame(index=chunk.index)
+
+    if pd.api.types.is_datetime64_dtype(chunk['Date']):
+        out['Date'] = chunk['Date']
+    else:
+        dates = chunk['Date'].astype(str).str.strip()
+        out['Date'] = pd.to_datetime(dates, format='%Y-%m-%d', errors='coerce')
+        unparsed = out['Date'].isna() & chunk['Date'].notna()
+        if unparsed.any():
+            out.loc[unparsed, 'Date'] = pd.to_datetime(dates[unparsed], errors='coerce')
+
+    out['Type'] = _text(chunk['Type'])
+    out['Name'] = _text(chunk['Name'])
+    out['Symbol'] = _text(chunk['Symbol'], 'upper')
+    out['Action'] = _text(chunk['Action'], 'capitalize')
+    for col in ['Rationale', 'Outcome_Notes', 'Order_ID']:
+        out[col] = chunk[col].fillna('').astype(str) if col in chunk.columns else ''
+
+    out['Quantity'] = pd.to_numeric(chunk['Quantity'], errors='coerce')
+    out['Price'] = pd.to_numeric(chunk['Price'], errors='coerce')
+    out['Total_Value'] = out['Quantity'] * out['Price']
+    if 'Current_Price' in chunk.columns:
+        out['Current_Price'] = pd.to_numeric(chunk['Current_Price'], errors='coerce').fillna(out['Price'])
+    else:
+        out['Current_Price'] = out['Price']
+    if 'Unrealized_PnL' in chunk.columns:
+        out['Unrealized_PnL'] = pd.to_numeric(chunk['Unrealized_PnL'], errors='coerce').fillna(0.0)
+    else:
+        out['Unrealized_PnL'] = 0.0
+
+    checks = [
+        (out['Date'].isna(), "invalid date"),
+        (out['Symbol'] == '', "missing symbol"),
+        (out['Name'] == '', "missing name"),
+        (~out['Action'].isin(VALID_ACTIONS), f"action must be one of {', '.join(VALID_ACTIONS)}"),
+        (~(out['Quantity'] > 0), "quantity must be greater than 0"),
+        (~(out['Price'] > 0), "price must be greater than 0"),
+    ]
+    if types is not None:
+        checks.append((~out['Type'].isin(types), f"type must be one of {', '.join(types)}"))
+    # Each row reports the first check it fails
+    failed = np.full(len(out), -1)
+    for k, (mask, _) in enumerate(checks):
+        failed[mask.to_numpy() & (failed < 0)] = k
+    invalid = failed >= 0
+    rows = np.flatnonzero(invalid)[:max_errors]
+    errors = [(first_row + int(i), checks[failed[i]][1]) for i in rows]
+
+    valid = out.loc[~invalid, JOURNAL_COLUMNS]
+    for col in CATEGORY_COLUMNS:
+        if isinstance(valid[col].dtype, pd.CategoricalDtype):
+            # Values only rejected rows used must not become store categories
+            valid[col] = valid[col].cat.remove_unused_categories()
+    return valid, errors
+
+
+def _validated_chunks(chunks, report, progress=None, fraction=None):
+    """Validate raw chunks in turn, tallying ``report``; yields each chunk's valid rows"""
+    first_row = 1
+    for chunk in chunks:
+        valid, errors = validate_transactions(chunk, first_row, max_errors=MAX_REPORTED_ERRORS - len(report.errors))
+        first_row += len(chunk)
+
+        report.rows_imported += len(valid)
+        report.rows_rejected += len(chunk) - len(valid)
+        report.errors.extend(errors)
+        if progress is not None:
+            progress(fraction(first_row - 1), report.rows_imported)
+        yield valid
+
+
+def import_csv(source, store, chunksize=IMPORT_CHUNK_ROWS, progress=None):
+    """Stream a journal CSV into ``store``, replacing its contents.
+
+    The file is read in ``chunksize`` row chunks with every column as text,
+    so nothing is type-inferred and bad values become row-level errors
+    instead of failing the whole file. Validated chunks stream into
+    ``store.replace_chunks``, which swaps the journal in one step: a file
+    that fails partway, or has no valid rows, leaves the journal untouched.
+    ``progress`` is called with the fraction of the file consumed and the
+    rows validated so far.
+    """
+    total_bytes = getattr(source, 'size', None)
+    report = ImportReport()
+    reader = pd.read_csv(
+        source,
+        dtype=str,
+        keep_default_na=False,
+        na_values=[''],
+        chunksize=chunksize,
+    )
+
+    chunks = iter(reader)
+    first = next(chunks, None)
+    if first is None:
+        return report
+    missing = [col for col in REQUIRED_IMPORT_COLUMNS if col not in first.columns]
+    if missing:
+        raise ValueError(f"CSV must contain columns: {', '.join(REQUIRED_IMPORT_COLUMNS)}")
+
+    fraction = lambda rows: min(source.tell() / total_bytes, 1.0) if total_bytes else 0.0
+    store.replace_chunks(_validated_chunks(chain([first], chunks), report, progress, fraction))
+    if progress is not None:
+        progress(1.0, report.rows_imported)
+    return report
+
+# Columnar (Parquet / Arrow IPC) export and import
+def journal_arrow_schema():
+    """Arrow schema the journal is written with and cast to on import"""
+    category = pa.dictionary(pa.int32(), pa.string())
+    types = {
+        'Date': pa.date32(),
+        **{col: category for col in CATEGORY_COLUMNS},
+        **{col: pa.string() for col in TEXT_COLUMNS},
+        **{col: pa.float64() for col in FLOAT_COLUMNS},
+    }
+    return pa.schema([pa.field(col, types[col], nullable=False) for col in JOURNAL_COLUMNS])
+
+
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'Arrow IPC (Feather)': ('feather', 'application/vnd.apache.arrow.file'),
+}
+COLUMNAR_EXTENSIONS = ['parquet', 'feather', 'arrow']
+
+
+def journal_to_arrow(df):
+    return pa.Table.from_pandas(df[JOURNAL_COLUMNS], schema=journal_arrow_schema(), preserve_index=False)
+
+
+def export_journal(df, fmt):
+    """Serialize the journal frame as CSV, Parquet or Arrow IPC bytes"""
+    if fmt == 'csv':
+        return df.to_csv(index=False).encode('utf-8')
+
+    buffer = BytesIO()
+    if fmt == 'parquet':
+        pq.write_table(journal_to_arrow(df), buffer, compression='zstd')
+    elif fmt == 'feather':
+        feather.write_feather(journal_to_arrow(df), buffer, compression='lz4')
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+    return buffer.getvalue()
+
+
+def _arrow_batches(source, fmt, batch_size):
+    if fmt == 'parquet':
+        parquet_file = pq.ParquetFile(source)
+        total_rows = parquet_file.metadata.num_rows
+        return parquet_file.schema_arrow, total_rows, parquet_file.iter_batches(batch_size=batch_size)
+    reader = pa.ipc.open_file(source)
+    batches = [reader.get_batch(i) for i in range(reader.num_record_batches)]
+    return reader.schema, sum(batch.num_rows for batch in batches), iter(batches)
+
+
+def import_columnar(source, store, fmt, batch_size=IMPORT_CHUNK_ROWS, progress=None):
+    """Load a Parquet or Arrow IPC journal into ``store``, replacing its contents.
+
+    Each record batch goes through ``validate_transactions`` like a CSV
+    chunk, so bad values become row-level errors and ``Total_Value`` is
+    recomputed, but typed columns are checked as they are instead of being
+    re-parsed. Validated batches stream into ``store.replace_chunks``, so
+    a file that fails partway, or has no valid rows, leaves the journal
+    untouched. Arrow IPC files are read in full up front; Parquet is
+    streamed batch by batch.
+    """
+    schema, total_rows, batches = _arrow_batches(source, fmt, batch_size)
+    missing = [col for col in REQUIRED_IMPORT_COLUMNS if col not in schema.names]
+    if missing:
+        raise ValueError(f"File must contain columns: {', '.join(REQUIRED_IMPORT_COLUMNS)}")
+
+    # Dictionaries stay categorical and date32 becomes datetime64: no text parsing
+    names = [name for name in JOURNAL_COLUMNS if name in schema.names]
+    report = ImportReport()
+    chunks = (batch.select(names).to_pandas(date_as_object=False) for batch in batches)
+    fraction = lambda rows: min(rows / max(total_rows, 1), 1.0)
+    store.replace_chunks(_validated_chunks(chunks, report, progress, fraction))
+    if progress is not None:
+        progress(1.0, report.rows_imported)
+    return report
@@ -0,0 +1,136 @@
+"""Per-user journals persisted server-side under a shared memory budget"""
+
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from .schema import SAMPLE_TRANSACTIONS
+from .store import SQLiteStore
+
+# Rough resident cost of an open store beyond its loaded rows: the SQLite
+# connection, its page cache and the running positions
+STORE_OVERHEAD_BYTES = 256 * 1024
+# An open store also holds three file descriptors (database, -wal and -shm),
+# so the byte budget alone would let the pool outgrow the process's nofile limit
+DEFAULT_MAX_OPEN_STORES = 256
+
+
+def user_filename(user_id):
+    """Filesystem-safe, collision-free database name for ``user_id``"""
+    user_id = str(user_id)
+    slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', user_id).strip('._')[:48] or 'user'
+    digest = hashlib.sha256(user_id.encode('utf-8')).hexdigest()[:12]
+    return f"{slug}-{digest}.db"
+
+
+class JournalPool:
+    """User-scoped SQLite journals, opened lazily and evicted LRU.
+
+    Each user's journal is its own SQLite file under ``directory``, so it
+    survives restarts and is shared by all of that user's sessions. Stores
+    are opened on first ``checkout`` and kept resident while the total of
+    their ``nbytes`` (plus a fixed per-store overhead) fits ``max_bytes``
+    and no more than ``max_stores`` are open; beyond either limit the least
+    recently used idle stores are closed. A closed journal is simply
+    reopened from disk on its next checkout.
+
+    ``checkout``/``checkin`` bracket each use so that a store another
+    thread is still reading is never closed under it; sizes are re-measured
+    at checkin, after the rerun has loaded whatever it needed.
+    """
+
+    def __init__(self, directory, max_bytes=512 * 1024 * 1024, max_stores=DEFAULT_MAX_OPEN_STORES,
+                 seed=SAMPLE_TRANSACTIONS):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_stores = max_stores
+        self.seed = seed
+        self.opens = 0
+        self.evictions = 0
+        self._stores = OrderedDict()
+        self._sizes = {}
+        self._active = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._stores)
+
+    def __contains__(self, user_id):
+        return str(user_id) in self._stores
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    def path(self, user_id):
+        return os.path.join(self.directory, user_filename(user_id))
+
+    def checkout(self, user_id):
+        """Return the user's store, opening it from disk if it is not resident"""
+        user_id = str(user_id)
+        with self._lock:
+            store = self._stores.get(user_id)
+            if store is None:
+                store = SQLiteStore(self.path(user_id), seed=self.seed)
+                self._stores[user_id] = store
+                self._sizes[user_id] = STORE_OVERHEAD_BYTES
+                self._bytes += STORE_OVERHEAD_BYTES
+                self.opens += 1
+            else:
+                self._stores.move_to_end(user_id)
+            self._active[user_id] = self._active.get(user_id, 0) + 1
+            self._evict()
+            return store
+
+    def checkin(self, user_id):
+        """Mark one use of the user's store finished and enforce the budget"""
+        user_id = str(user_id)
+        with self._lock:
+            active = self._active.get(user_id, 0) - 1
+            if active > 0:
+                self._active[user_id] = active
+            else:
+                self._active.pop(user_id, None)
+            store = self._stores.get(user_id)
+            if store is not None:
+                size = store.nbytes + STORE_OVERHEAD_BYTES
+                self._bytes += size - self._sizes[user_id]
+                self._sizes[user_id] = size
+            self._evict()
+
+    def _evict(self):
+        # Oldest first; stores in use are skipped, and the most recently
+        # used one stays resident even when it alone exceeds the budget
+        candidates = iter(list(self._stores)[:-1])
+        while self._bytes > self.max_bytes or len(self._stores) > self.max_stores:
+            user_id = next(candidates, None)
+            if user_id is None:
+                break
+            if user_id in self._active:
+                continue
+            self._stores.pop(user_id).close()
+            self._bytes -= self._sizes.pop(user_id)
+            self.evictions += 1
+
+    def close(self):
+        with self._lock:
+            for store in self._stores.values():
+                store.close()
+            self._stores.clear()
+            self._sizes.clear()
+            self._active.clear()
+            self._bytes = 0
+
+
+def open_journal_pool(directory=None, max_bytes=None, max_stores=None):
+    """Pool configured by ``JOURNAL_USERS_DIR``, ``JOURNAL_MEMORY_BUDGET_MB`` and ``JOURNAL_MAX_OPEN_STORES``"""
+    directory = directory or os.environ.get('JOURNAL_USERS_DIR', 'journals')
+    if max_bytes is None:
+        max_bytes = int(float(os.environ.get('JOURNAL_MEMORY_BUDGET_MB', 512)) * 1024 * 1024)
+    if max_stores is None:
+        max_stores = int(os.environ.get('JOURNAL_MAX_OPEN_STORES', DEFAULT_MAX_OPEN_STORES))
+    return JournalPool(directory, max_bytes, max_stores)
@@ -0,0 +1,46 @@
+"""Batch revaluation of open positions against a quote snapshot"""
+
+import numpy as np
+import pandas as pd
+
+from .lots import compute_lots
+
+
+def revalue_columns(df, quotes):
+    """Current_Price and Unrealized_PnL after marking open positions to ``quotes``.
+
+    Open quantities and costs come from the date-ordered FIFO lot walk
+    (``compute_lots``) over the quoted symbols, so sells between buys and
+    positions closed and reopened are costed as Portfolio Review costs
+    them. Every row of a symbol that is still held and has a quote gets
+    the new Current_Price; the Buy row that opened each open lot carries
+    ``open quantity × (quote − unit cost)`` and every other row 0, so a
+    symbol's rows sum to its FIFO unrealized P&L. Rows of a quoted symbol
+    whose position is closed have their leftover unrealized P&L reset to
+    0. Returns ``(current_price, unrealized_pnl, rows_updated)``.
+    """
+    current_price = df['Current_Price'].to_numpy(dtype=np.float64, copy=True)
+    unrealized_pnl = df['Unrealized_PnL'].to_numpy(dtype=np.float64, copy=True)
+    if df.empty or not quotes:
+        return current_price, unrealized_pnl, 0
+
+    symbols = df['Symbol'].astype(str)
+    quote = symbols.map(pd.Series(quotes, dtype=np.float64)).to_numpy(dtype=np.float64)
+    quoted = ~np.isnan(quote)
+    rows = np.flatnonzero(quoted)
+    lots = compute_lots(df.iloc[rows], 'fifo')
+    lot_rows = rows[lots.open_rows]
+
+    held = quoted & symbols.isin(lots.holdings['Symbol'].astype(str)).to_numpy()
+    stale = quoted & ~held & (unrealized_pnl != 0)
+    current_price[held] = quote[held]
+    unrealized_pnl[held | stale] = 0.0
+    unrealized_pnl[lot_rows] = lots.open_lots['Quantity'].to_numpy() * (
+        quote[lot_rows] - lots.open_lots['Unit_Cost'].to_numpy()
+    )
+    return current_price, unrealized_pnl, int(held.sum() + stale.sum())
+
+
+def revalue_journal(store, provider):
+    """Fetch quotes for every symbol in ``store`` and mark it to them; returns rows updated"""
+    return store.revalue(provider.get_quotes(store.symbols()))